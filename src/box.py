@@ -11,51 +11,318 @@ Handles NFC card reading, story selection, audio playback, button events, volume
 - Keyboard controls: 'p' (pause/resume), 'n' (new story), 'q'/ESC (quit)
 """
 
+import heapq
+import logging
 import os
 import time
-import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pygame
-import sys
 import threading  # Added for asynchronous loading
 from utils.log_utils import logger
 
 from hardware.hal import IS_RASPBERRY_PI, BUTTON_NO_EVENT, BUTTON_TAP, BUTTON_DOUBLE_TAP, BUTTON_LONG_PRESS
+from hardware.hal import CardPresenceFilter, CardPoller, CARD_NO_EVENT, CARD_PRESENT, CARD_REMOVED
 from utils.time_utils import handle_battery_status
-from adafruit_mcp3xxx.analog_in import AnalogIn
 
 # Import from utility modules
 from utils.audio_utils import (
-    initialize_audio_engine, set_system_volume, preload_bgm, 
+    initialize_audio_engine, set_system_volume, preload_bgm, prewarm_audio_files, 
     play_narration_with_bgm, test_audio_performance, play_error_sound,
-    preload_narration_async,  # New async preloading function
+    preload_narration_async, preload_all_narrations, preload_feedback_sounds,
     play_card_valid_sound, play_card_invalid_sound, play_transition_sound,
-    play_boot_sound, play_shutdown_sound, play_pause_sound, play_resume_sound, play_success_sound
+    play_boot_sound, play_shutdown_sound, play_pause_sound, play_resume_sound, play_success_sound,
+    stop_all, stop_story, is_audio_ready, is_bgm_busy, prefetch_narration, MUSIC_END_EVENT, FEEDBACK_END_EVENT, NARRATION_END_EVENT,
+    STORY_PLAYBACK, pause_story, resume_story, shutdown_decoders
 )
 from utils.data_utils import load_card_stories, verify_audio_files, preload_card_data  # Added preload_card_data
-from utils.time_utils import is_calm_time, select_story_for_time
-from utils.led_utils import LedPatternManager
-from utils.bgm_utils import stop_bgm
+from utils.time_utils import is_calm_time, select_story_for_card
+from utils.led_utils import (
+    LedPatternManager, BREATHE_IDLE, SOLID_ON, FADE_TO_IDLE, BLINK_AUDIO_FAILURE, BLINK_HARDWARE_FAILURE,
+    FLASH_EMPTY_CARD, FLASH_CARD_ERROR, PULSE_NETWORK_ERROR
+)
+from utils.sched_utils import (
+    set_realtime_priority, prioritize_audio_threads, elevate_current_thread, restore_current_thread,
+    drop_inherited_priority
+)
 
 # Import configuration
 from config.app_config import (
     STATE_IDLE, STATE_PLAYING, STATE_PAUSED, STATE_SHUTTING_DOWN,
-    LED_OFF, LED_ON, VOLUME_CHECK_INTERVAL, MAIN_LOOP_INTERVAL,
-    IDLE_SHUTDOWN_TIMEOUT_MINUTES # Added IDLE_SHUTDOWN_TIMEOUT_MINUTES
+    LED_OFF, LED_ON, VOLUME_CHECK_INTERVAL, VOLUME_DEADBAND,
+    IDLE_SHUTDOWN_TIMEOUT_MINUTES, # Added IDLE_SHUTDOWN_TIMEOUT_MINUTES
+    BATTERY_CHECK_INTERVAL, BUTTON_POLL_INTERVAL, IDLE_POLL_INTERVAL, INPUT_IDLE_TIMEOUT, LED_UPDATE_INTERVAL,
+    NFC_CONFIRM_READS, NFC_REMOVAL_MISSES, NFC_READ_STALL_TIMEOUT, NFC_WATCHDOG_INTERVAL, NFC_PLAYING_READ_INTERVAL, AUDIO_THREAD_RT_PRIORITY, LED_THREAD_RT_PRIORITY,
+    MAIN_THREAD_RT_PRIORITY, FEEDBACK_CHANNEL_ID, FEEDBACK_GAP_MS
 )
 
 # Hardware components
+from hardware.hal import UIDReader, Button, VolumeControl
 if IS_RASPBERRY_PI:
-    from hardware.hal import UIDReader, Button, VolumeControl
     import RPi.GPIO as GPIO  # For cleanup
-else:
-    from hardware.hal import UIDReader, Button, VolumeControl
 
 # Global flag for background loading
 background_loading_active = False
 
+# Posted by GPIO edge callbacks and the NFC poller to wake the main loop (MUSIC_END_EVENT is USEREVENT + 1)
+HARDWARE_WAKE_EVENT = pygame.USEREVENT + 2
+# One-shot timer for the pause between a feedback sound and its follow-up (FEEDBACK_END_EVENT is USEREVENT + 3)
+FEEDBACK_STEP_EVENT = pygame.USEREVENT + 4
+# One-shot timer that fires when no new story has started for IDLE_SHUTDOWN_TIMEOUT_MINUTES
+IDLE_SHUTDOWN_EVENT = pygame.USEREVENT + 5
+# Posted by the volume sampler thread with the new raw knob level (NARRATION_END_EVENT is USEREVENT + 6)
+VOLUME_CHANGED_EVENT = pygame.USEREVENT + 7
+
+
+class HardwareWakeup:
+    """
+    Stand-in for the threading.Event passed to hal's attach_wakeup(): set() posts a
+    HARDWARE_WAKE_EVENT to the SDL queue, at most one until the main loop calls clear().
+    """
+    def __init__(self):
+        self._pending = threading.Event()
+
+    def set(self):
+        if not self._pending.is_set():
+            self._pending.set()
+            pygame.event.post(pygame.event.Event(HARDWARE_WAKE_EVENT))
+
+    def clear(self):
+        self._pending.clear()
+
+# Debug telemetry: how often the loop's work-time average is logged (seconds) and each iteration's weight in it
+LOOP_STATS_INTERVAL = 5.0
+LOOP_EMA_WEIGHT = 0.05
+
+# Example UIDs whose tap preloads the next card's narrations, and the UID that follows each
+_PRELOAD_TRIGGER_UIDS = frozenset({"000000", "000001", "000002", "000003", "000004"})
+_PRELOAD_NEXT = {uid: f"{int(uid) + 1:06d}" for uid in _PRELOAD_TRIGGER_UIDS}
+
+# Narration preloads share two workers so repeated taps don't spawn threads or pile up on the SD card
+# Its threads start on the first tap, from the elevated main loop, so each one drops that priority first
+_PRELOAD_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="preload",
+                                   initializer=drop_inherited_priority)
+# UIDs queued or being preloaded; a tap for one of these is dropped
+_preload_inflight = set()
+
+
+def schedule_narration_preload(uid):
+    """Queue preload_narration_async(uid) on the preload pool unless it's already pending"""
+    if uid in _preload_inflight:
+        return
+    _preload_inflight.add(uid)
+    future = _PRELOAD_POOL.submit(preload_narration_async, uid)
+    future.add_done_callback(lambda _, uid=uid: _preload_inflight.discard(uid))
+
+
+class FeedbackSequencer:
+    """
+    Chains a feedback sound to what should happen after it without blocking the main loop.
+    play() starts the sound and stores the follow-up; the main loop passes each event to
+    handle_event(), which runs the follow-up once FEEDBACK_END_EVENT (plus an optional gap) arrives.
+    Follow-ups return the next state, or None to stay put, like the TRANSITIONS handlers.
+    """
+    def __init__(self):
+        self._after_sound = None
+        self._gap_ms = 0
+
+    def play(self, play_sound, after_sound=None, gap_ms=0):
+        """Start play_sound(), replacing any follow-up still pending; returns a state if after_sound ran now"""
+        self.cancel()
+        if play_sound():
+            self._after_sound = after_sound
+            self._gap_ms = gap_ms
+            return None
+        # Sound missing or audio down: nothing will end, so move on straight away
+        return after_sound() if after_sound else None
+
+    def cancel(self):
+        self._after_sound = None
+        pygame.time.set_timer(FEEDBACK_STEP_EVENT, 0)
+
+    def handle_event(self, event):
+        """Run the pending follow-up if this event completes its sound; returns its next state"""
+        if self._after_sound is None:
+            return None
+        if event.type == FEEDBACK_END_EVENT:
+            # A sound cut off by stop_all() or a newer cue also ends the channel; only act once it's idle
+            if pygame.mixer.Channel(FEEDBACK_CHANNEL_ID).get_busy():
+                return None
+            if self._gap_ms:
+                pygame.time.set_timer(FEEDBACK_STEP_EVENT, self._gap_ms, loops=1)
+                return None
+        elif event.type != FEEDBACK_STEP_EVENT:
+            return None
+        after_sound, self._after_sound = self._after_sound, None
+        return after_sound()
+
+
+class Session:
+    """Playback state shared by the main loop and the TRANSITIONS handlers"""
+    def __init__(self, led_manager):
+        self.led_manager = led_manager
+        self.feedback = FeedbackSequencer()
+        self.card_uid: str | None = None
+        self.card_data: dict | None = None # Parsed JSON of card_uid, reused when reselecting
+        self.story_data: list | None = None
+        self.narration_path: Path | None = None
+        self.bgm_tone: str | None = None
+
+
+def wait_for_feedback(max_wait=2.0):
+    """
+    Block until feedback sounds finish (at most max_wait seconds), keeping the event queue serviced.
+    Only for exits (shutdown, startup failure), where nothing else needs the loop.
+    """
+    sound_start_time = time.monotonic()
+    while pygame.mixer.get_busy() and (time.monotonic() - sound_start_time < max_wait):
+        pygame.event.pump()
+        time.sleep(0.02)
+
+
+def on_pause(session):
+    pause_story(time.monotonic())
+    session.feedback.play(play_pause_sound)
+    session.led_manager.apply(BREATHE_IDLE)
+    logger.info("Playback PAUSED")
+    return STATE_PAUSED
+
+
+def on_resume(session):
+    resume_story(time.monotonic())
+    session.feedback.play(play_resume_sound)
+    session.led_manager.apply(SOLID_ON)
+    logger.info("Playback RESUMED")
+    return STATE_PLAYING
+
+
+def on_reselect(session):
+    """Pick another story for the card that is already on the reader"""
+    led_manager = session.led_manager
+    if not session.card_uid:
+        logger.info("New story requested but no active card.")
+        session.feedback.play(play_error_sound)
+        return None
+    logger.info("Reselecting story for current card.")
+    stop_story()
+    led_manager.set_loading_pattern()
+    session.feedback.play(play_transition_sound, lambda: start_reselected_story(session), gap_ms=FEEDBACK_GAP_MS)
+    # Nothing is playing until the transition cue ends
+    return STATE_IDLE
+
+
+def start_reselected_story(session):
+    """Follow-up to on_reselect's transition sound"""
+    led_manager = session.led_manager
+    card_data = session.card_data
+    if not card_data or not card_data.get("stories"):
+        logger.warning("No stories for current card, returning to idle.")
+        led_manager.apply(BREATHE_IDLE)
+        session.feedback.play(play_error_sound)
+        return STATE_IDLE
+    if not select_story(session) or not play_narration_with_bgm(session.narration_path, session.bgm_tone):
+        session.feedback.play(play_error_sound)
+        return STATE_IDLE
+    led_manager.set_success_pattern(next_pattern='solid')
+    return STATE_PLAYING
+
+
+def select_story(session):
+    """
+    Pick a story from session.card_data for the current time of day and store its
+    narration path and tone on the session. Shows the error pattern if its audio is missing.
+
+    Returns:
+        bool: True if the story can be played
+    """
+    selected_story = select_story_for_card(session.card_data, is_calm_time())
+    logger.info("Selected story: %s (tone: %s)", selected_story['title'], selected_story.get('tone'))
+    session.narration_path = selected_story["audio_path"]
+    session.bgm_tone = selected_story.get("tone", "calmo")
+    if not selected_story["ok"]:
+        logger.error("Audio file not found: %s", session.narration_path)
+        session.led_manager.set_error_pattern(count=2)
+        return False
+    return True
+
+
+def on_shutdown(session):
+    logger.info("Long press: Initiating shutdown.")
+    session.feedback.cancel()
+    session.led_manager.set_shutdown()
+    play_shutdown_sound()
+    wait_for_feedback(3.0) # Longer wait for shutdown sound
+    stop_all()
+    return STATE_SHUTTING_DOWN
+
+
+def on_new_card(session):
+    """
+    Load the card just placed on the reader and queue its cues: transition, then card
+    valid/invalid, then the story (or the error sound). Returns STATE_IDLE while they play.
+    """
+    led_manager = session.led_manager
+    uid = session.card_uid
+    if uid in _PRELOAD_TRIGGER_UIDS:
+        schedule_narration_preload(_PRELOAD_NEXT[uid])
+    card_data = load_card_stories(uid)
+    playable = False
+    if not card_data:
+        logger.error("Invalid or missing JSON for card %s", uid)
+        led_manager.set_card_sequence(is_valid=False)
+    elif not card_data.get("stories"):
+        logger.warning("Empty card: no stories for card %s", uid)
+        led_manager.apply(FLASH_EMPTY_CARD)
+    else:
+        session.card_data = card_data
+        session.story_data = card_data["stories"]
+        playable = select_story(session)
+        if playable:
+            # Decode during the transition and card-valid cues rather than after them
+            prefetch_narration(session.narration_path)
+
+    feedback = session.feedback
+    if not playable:
+        session.card_uid = None
+
+        def after_transition():
+            return feedback.play(play_card_invalid_sound, lambda: feedback.play(play_error_sound),
+                                 gap_ms=FEEDBACK_GAP_MS)
+    else:
+        def after_transition():
+            return feedback.play(play_card_valid_sound, lambda: start_card_story(session), gap_ms=FEEDBACK_GAP_MS)
+    return feedback.play(play_transition_sound, after_transition, gap_ms=FEEDBACK_GAP_MS) or STATE_IDLE
+
+
+def start_card_story(session):
+    """Last step of on_new_card's cues: start the selected story"""
+    if not play_narration_with_bgm(session.narration_path, session.bgm_tone):
+        session.led_manager.set_error_pattern(count=2)
+        session.card_uid = None
+        return session.feedback.play(play_error_sound) or STATE_IDLE
+    logger.info("Transitioning to PLAYING state")
+    session.led_manager.set_card_sequence(is_valid=True)
+    return STATE_PLAYING
+
+
+# Button events per state; a handler returns the next state, or None to stay put
+TRANSITIONS = {
+    (STATE_PLAYING, BUTTON_TAP): on_pause,
+    (STATE_PAUSED, BUTTON_TAP): on_resume,
+    (STATE_IDLE, BUTTON_DOUBLE_TAP): on_reselect,
+    (STATE_PLAYING, BUTTON_DOUBLE_TAP): on_reselect,
+    (STATE_PAUSED, BUTTON_DOUBLE_TAP): on_reselect,
+    (STATE_IDLE, BUTTON_LONG_PRESS): on_shutdown,
+    (STATE_PLAYING, BUTTON_LONG_PRESS): on_shutdown,
+    (STATE_PAUSED, BUTTON_LONG_PRESS): on_shutdown,
+}
+
+# Desktop keyboard controls: 'p' and 'n' stand in for a tap and a double tap
+KEY_BUTTON_EVENTS = {pygame.K_p: BUTTON_TAP, pygame.K_n: BUTTON_DOUBLE_TAP}
+QUIT_KEYS = frozenset({pygame.K_q, pygame.K_ESCAPE})
+
 # ============ MAIN APPLICATION ============
-def main():
+def main(audio_buffer=None):
     """
     Main application loop.
     - Initializes hardware abstraction (real or mock)
@@ -63,27 +330,32 @@ def main():
     - Integrates volume knob and error handling
     - Monitors battery status
     - Cleans up on exit
+
+    Args:
+        audio_buffer (int, optional): Mixer buffer size in samples (defaults to AUDIO_BUFFER)
     """
     # Defer Pygame display initialization
     # pygame.init() # Moved lower
     # pygame.display.set_mode((200, 100)) # Moved lower
     # pygame.display.set_caption("Storyteller Control") # Moved lower
 
-    global master_volume_level
-    
     # Fast audio engine initialization
     start_time = time.time()
-    if not initialize_audio_engine(): # This already calls pygame.mixer.init()
+    if not initialize_audio_engine(buffer=audio_buffer): # This already calls pygame.mixer.init()
         logger.critical("Failed to initialize audio. Exiting.")
         if IS_RASPBERRY_PI and 'button' in locals() and button: # Check if button was initialized
             led_manager = LedPatternManager(button)
-            led_manager.set_pattern('blink', period=0.15, duty=0.5)
+            led_manager.apply(BLINK_AUDIO_FAILURE)
         elif not IS_RASPBERRY_PI and 'button' in locals() and button: # Mock environment
             # In a mock setup, we might not have a physical LED, but can log
             logger.info("Mock LED: Blink pattern (0.15s period, 0.5 duty)")
         play_error_sound()
+        wait_for_feedback()
         return
     logger.info(f"Audio engine initialization took {(time.time() - start_time)*1000:.1f}ms")
+    if IS_RASPBERRY_PI:
+        # Keep the mixer thread ahead of everything else to avoid underruns (pops)
+        prioritize_audio_threads(AUDIO_THREAD_RT_PRIORITY)
     
     # Hardware initialization (extracted to a function)
     reader, button, volume_ctrl, adc = initialize_hardware()
@@ -92,139 +364,211 @@ def main():
         logger.critical("Critical hardware components failed to initialize")
         if IS_RASPBERRY_PI and button: # Check if button was initialized before trying to use led_manager
             led_manager = LedPatternManager(button)
-            led_manager.set_pattern('blink', period=0.1, duty=0.5)
+            led_manager.apply(BLINK_HARDWARE_FAILURE)
         elif not IS_RASPBERRY_PI and button: # Mock environment
              logger.info("Mock LED: Blink pattern (0.1s period, 0.5 duty)")
         play_error_sound() # Ensure error sound is played
+        wait_for_feedback()
         return # Exit if hardware fails
     
     led_manager = LedPatternManager(button)
-    
-    preload_start = time.time()
-    preload_bgm() # This can take time
-    logger.info(f"BGM preloading took {(time.time() - preload_start)*1000:.1f}ms")
+    # LED animation runs on its own thread so the main loop can block on hardware events
+    threading.Thread(target=run_led_thread, args=(led_manager,), daemon=True).start()
     
     preload_thread = threading.Thread(target=background_preload, daemon=True)
     preload_thread.start()
     
-    current_card_uid = None
-    current_story_data = None
-    current_narration_path = None
-    current_bgm_tone = None
+    session = Session(led_manager)
     
-    state = STATE_IDLE
-    last_activity_time = time.time() # Initialize last activity time for idle shutdown
-    last_story_played_time = time.time() # Initialize time for idle shutdown
+    state: str = STATE_IDLE
+    # The mock reader simulates one tap per read, so only real hardware needs confirmation
+    card_filter = CardPresenceFilter(confirm_reads=NFC_CONFIRM_READS if IS_RASPBERRY_PI else 1,
+                                     removal_misses=NFC_REMOVAL_MISSES)
+    last_activity_time = time.monotonic() # Initialize last activity time for idle shutdown
     button.set_led(LED_ON)
     logger.info(f"System started, state: {state}")
     logger.info(f"Running on {'Raspberry Pi' if IS_RASPBERRY_PI else 'Mock Hardware'}")
     
-    last_volume_check_time = time.time()
-    last_battery_check_time = time.time()
-    last_loop_time = time.time()
+    last_loop_time = time.monotonic()
+    loop_ema_ms = 0.0 # Time spent handling one wake-up, excluding the wait
+    # Idle shutdown is a one-shot SDL timer re-armed whenever a story starts, rather than a per-iteration check
+    idle_shutdown_ms = int(IDLE_SHUTDOWN_TIMEOUT_MINUTES * 60 * 1000)
+    idle_shutdown_due = False
+
+    def arm_idle_shutdown():
+        """(Re)start the idle shutdown countdown; SDL replaces any timer already running"""
+        nonlocal idle_shutdown_due
+        idle_shutdown_due = False
+        if idle_shutdown_ms > 0: # Only if timeout is set
+            pygame.time.set_timer(IDLE_SHUTDOWN_EVENT, idle_shutdown_ms, loops=1)
+    
+    set_system_volume(volume_ctrl.get_volume()) # Pass raw knob value
+    # ADC reads happen on their own thread, started once the event queue is up; it posts
+    # VOLUME_CHANGED_EVENT when the knob moves, so the loop doesn't wake up to check it
+    volume_sampler_stop = threading.Event()
+    
+    def check_battery():
+        handle_battery_status(adc, led_manager)
     
-    target_loop_time = 0.02
+    def check_nfc_watchdog():
+        card_poller.check_watchdog()
     
-    master_volume_level = volume_ctrl.get_volume() 
-    set_system_volume(master_volume_level)
+    # Periodic checks as a heap of (monotonic deadline, order, interval, callback)
+    now = time.monotonic()
+    periodic_tasks = []
+    if IS_RASPBERRY_PI: # Only on RPi
+        periodic_tasks.append((now + BATTERY_CHECK_INTERVAL, 1, BATTERY_CHECK_INTERVAL, check_battery))
+    periodic_tasks.append((now + NFC_WATCHDOG_INTERVAL, 2, NFC_WATCHDOG_INTERVAL, check_nfc_watchdog))
+    heapq.heapify(periodic_tasks)
     
     # NOW initialize pygame.display and set up the window
-    pygame.init() # Initialize all pygame modules if not done by mixer
-    pygame.display.set_mode((200, 100))
-    pygame.display.set_caption("Storyteller Control")
-    pygame.mouse.set_visible(True) # Ensure mouse is visible
+    # Autostarted Pis have no keyboard or screen; STORYTELLER_HEADLESS=0 brings the control window back
+    headless = IS_RASPBERRY_PI and os.environ.get("STORYTELLER_HEADLESS", "1") == "1"
+    if headless:
+        # The event queue needs the video subsystem; the dummy driver provides it without a framebuffer,
+        # and skipping pygame.init() avoids probing joysticks, fonts and the like
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.display.init()
+    else:
+        pygame.init() # Initialize all pygame modules if not done by mixer
+        # The window is only a keyboard-event sink; nothing is drawn, so it's flipped once here
+        pygame.display.set_mode((200, 100))
+        pygame.display.set_caption("Storyteller Control")
+        pygame.mouse.set_visible(True) # Ensure mouse is visible
+        pygame.display.flip()
+    # Only queue what the loop handles, so mouse motion, window and joystick events aren't allocated
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, MUSIC_END_EVENT, HARDWARE_WAKE_EVENT,
+                              FEEDBACK_END_EVENT, FEEDBACK_STEP_EVENT, IDLE_SHUTDOWN_EVENT, NARRATION_END_EVENT,
+                              VOLUME_CHANGED_EVENT])
+    arm_idle_shutdown()
+    threading.Thread(target=run_volume_sampler, args=(volume_ctrl, volume_sampler_stop), daemon=True).start()
+    
+    # GPIO edge callbacks and the NFC poller post to the SDL queue, so one
+    # pygame.event.wait() covers hardware, keyboard and mixer end events
+    wake_event = HardwareWakeup()
+    button.attach_wakeup(wake_event)
+    # NFC reads run on their own thread; only debounced card events reach the main loop
+    card_poller = CardPoller(reader, card_filter, main_wake=wake_event, stall_timeout=NFC_READ_STALL_TIMEOUT,
+                             thread_init=drop_inherited_priority)
+    card_poller.start()
 
     # System booting up: show boot sequence
     led_manager.set_boot_sequence()
-    play_boot_sound() # This function has its own wait, we'll address it next
-    # Wait for boot sound to finish and give a slight pause
-    while pygame.mixer.get_busy(): 
-        pygame.event.pump() # Process events to keep window responsive
-        time.sleep(0.05) # Shorter sleep
-    time.sleep(0.2)  # Shorter additional pause
+    play_boot_sound() # Returns immediately; a card tapped during the chime cuts it off
 
     total_startup_time = time.time() - start_time
     logger.info(f"Total startup time: {total_startup_time*1000:.1f}ms")
 
+    last_input_time = time.monotonic() # Any button edge, key press or card event
+    now = last_input_time
+    prev_state = None
+    # Bind methods used on every iteration to locals to skip the attribute lookups
+    monotonic = time.monotonic
+    wait_for_event = pygame.event.wait
+    get_events = pygame.event.get
+    needs_polling = button.needs_polling
+    get_button_event = button.get_event
+    get_card_event = card_poller.get_event
+    # Log level is fixed at startup; skip debug-only bookkeeping when it's off
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    # Keep input handling ahead of background work; dropped again before shutting down.
+    # Threads started from here on inherit it, so the pools and NFC poller call drop_inherited_priority()
+    main_priority = elevate_current_thread(MAIN_THREAD_RT_PRIORITY) if IS_RASPBERRY_PI else None
+    cleaned_up = False
+
+    def cleanup():
+        """Stop workers, audio and hardware; runs once whichever way the loop exits"""
+        nonlocal cleaned_up
+        if cleaned_up:
+            return
+        cleaned_up = True
+        logger.info("Performing final cleanup...")
+        restore_current_thread(main_priority)
+        led_manager.stop()
+        volume_sampler_stop.set()
+        card_poller.stop()
+        shutdown_decoders()
+        # Drop queued preloads but let running ones finish: a decode still going at pygame.quit() deadlocks exit
+        _PRELOAD_POOL.shutdown(wait=True, cancel_futures=True)
+        if is_audio_ready():
+            stop_all()
+        reader.cleanup()
+        button.cleanup()
+        volume_ctrl.cleanup()
+        if IS_RASPBERRY_PI:
+            GPIO.cleanup()
+            logger.info("[HAL] GPIO.cleanup() called.")
+        pygame.quit()
+        logger.info("Pygame quit.")
+
     try:
         while state != STATE_SHUTTING_DOWN:
-            loop_start_time_debug = time.time() # For debugging loop duration
-            led_manager.update()
+            # Block until an SDL event arrives or the next periodic check is due
+            wait_timeout = max(0.0, periodic_tasks[0][0] - now)
+            playback_deadline = STORY_PLAYBACK.next_deadline() # Next fade step or story step
+            if playback_deadline is not None:
+                wait_timeout = min(wait_timeout, max(0.0, playback_deadline - now))
+            button_dirty = needs_polling()
+            if button_dirty:
+                # Poll quickly right after interaction; relax during long, untouched playback
+                input_idle = state == STATE_PLAYING and now - last_input_time > INPUT_IDLE_TIMEOUT
+                wait_timeout = min(wait_timeout, IDLE_POLL_INTERVAL if input_idle else BUTTON_POLL_INTERVAL)
+            # A timeout of 0 would wait forever, so always wait at least 1ms
+            first_event = wait_for_event(max(1, int(wait_timeout * 1000)))
+            wake_event.clear()
+            pending_events = get_events()
+            if first_event.type != pygame.NOEVENT:
+                pending_events.insert(0, first_event)
+            # One clock read per iteration; handlers below reuse it
+            now = monotonic()
+            # A button edge posts a wake event, so with nothing pending and no press being
+            # resolved this wake-up was only a task deadline and the button can be skipped
+            button_dirty = button_dirty or bool(pending_events)
 
             # --- Keyboard Input Handling ---
-            for event in pygame.event.get(): # This also pumps events
+            for event in pending_events:
+                if event.type in (HARDWARE_WAKE_EVENT, pygame.KEYDOWN):
+                    last_input_time = now
                 if event.type == pygame.QUIT:  # Window close event
                     logger.info("Pygame window closed, initiating shutdown.")
                     state = STATE_SHUTTING_DOWN
                     break
-                if event.type == pygame.KEYDOWN:
-                    logger.debug(f"Key pressed: {pygame.key.name(event.key)} (code: {event.key})") # DEBUG PRINT
-                    if event.key == pygame.K_p: # Toggle Pause/Resume
+                if event.type in (FEEDBACK_END_EVENT, FEEDBACK_STEP_EVENT):
+                    new_state = session.feedback.handle_event(event)
+                    if new_state:
+                        state = new_state
                         if state == STATE_PLAYING:
-                            pygame.mixer.music.pause()
-                            play_pause_sound()
-                            # Wait for sound to finish while pumping events
-                            sound_start_time = time.time()
-                            while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0): # Max 2s wait
-                                pygame.event.pump()
-                                time.sleep(0.02)
-                            led_manager.set_pattern('breathing', period=2.5)
-                            state = STATE_PAUSED
-                            logger.info("Playback PAUSED (Keyboard)")
-                        elif state == STATE_PAUSED:
-                            pygame.mixer.music.unpause()
-                            play_resume_sound()
-                            sound_start_time = time.time()
-                            while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0): # Max 2s wait
-                                pygame.event.pump()
-                                time.sleep(0.02)
-                            led_manager.set_pattern('solid', state=True)
-                            state = STATE_PLAYING
-                            logger.info("Playback RESUMED (Keyboard)")
-                    elif event.key == pygame.K_n: # New Story
-                        if current_card_uid and state in [STATE_PLAYING, STATE_PAUSED, STATE_IDLE]:
-                            logger.info("Keyboard 'n': Reselecting story for current card.")
-                            stop_bgm()
-                            pygame.mixer.stop() 
-                            led_manager.set_loading_pattern()
-                            play_transition_sound()
-                            sound_start_time = time.time()
-                            while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0): 
-                                pygame.event.pump()
-                                time.sleep(0.02)
-                            time.sleep(0.3) # Keep this specific pause after transition
-
-                            card_data = load_card_stories(current_card_uid) 
-                            if card_data and card_data.get("stories"):
-                                stories = card_data["stories"]
-                                selected_story = select_story_for_time(stories, is_calm_time())
-                                new_narration_path = Path(__file__).parent / selected_story["audio"]
-                                new_bgm_tone = selected_story.get("tone", "calmo")
-                                if new_narration_path.exists():
-                                    logger.info(f"Playing new story (Keyboard): {selected_story['title']}")
-                                    current_narration_path = new_narration_path 
-                                    current_bgm_tone = new_bgm_tone 
-                                    play_narration_with_bgm(current_narration_path, current_bgm_tone)
-                                    # play_success_sound() # Success sound is part of play_narration_with_bgm or should be called carefully
-                                    # Ensure narration has started before trying to play success or waiting
-                                    # This part needs careful sequencing if success sound is desired here
-                                    led_manager.set_success_pattern(next_pattern='solid') # Set pattern immediately
-                                    state = STATE_PLAYING
-                                else:
-                                    logger.error(f"Audio for new story not found (Keyboard): {new_narration_path}")
-                                    led_manager.set_error_pattern(count=2)
-                                    play_error_sound()
-                                    state = STATE_IDLE 
-                            else:
-                                logger.warning("No stories for current card on 'n' key, returning to idle.")
-                                led_manager.set_pattern('solid', state=True) 
-                                play_error_sound() 
-                                state = STATE_IDLE
-                        else:
-                            logger.info("Keyboard 'n': No active card or invalid state for new story.")
-                            play_error_sound() 
-
-                    elif event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
+                            arm_idle_shutdown()
+                    continue
+                if event.type == VOLUME_CHANGED_EVENT:
+                    set_system_volume(event.level)
+                    continue
+                if event.type == NARRATION_END_EVENT:
+                    STORY_PLAYBACK.narration_ended(now)
+                    continue
+                if event.type == IDLE_SHUTDOWN_EVENT:
+                    # Acted on once the box is idle, so a story or pause in progress finishes first
+                    idle_shutdown_due = True
+                    continue
+                if event.type == MUSIC_END_EVENT:
+                    # stop_story() and loading a new story also post this; if BGM is playing
+                    # again by the time it's handled, it belongs to a story that was replaced
+                    if state == STATE_PLAYING and not is_bgm_busy():
+                        logger.info("Playback finished, returning to IDLE state.")
+                        led_manager.apply(FADE_TO_IDLE)
+                        state = STATE_IDLE
+                        session.card_uid = None
+                    continue
+                if event.type == pygame.KEYDOWN:
+                    if debug_enabled:
+                        logger.debug("Key pressed: %s (code: %s)", pygame.key.name(event.key), event.key)
+                    key_button_event = KEY_BUTTON_EVENTS.get(event.key)
+                    if key_button_event is not None:
+                        handler = TRANSITIONS.get((state, key_button_event))
+                        if handler:
+                            state = handler(session) or state
+                    elif event.key in QUIT_KEYS:
                         logger.info("Quit key pressed, initiating shutdown.")
                         state = STATE_SHUTTING_DOWN
                         break
@@ -232,257 +576,94 @@ def main():
             if state == STATE_SHUTTING_DOWN: 
                 continue
             
-            current_time = time.time()
-            
-            if current_time - last_volume_check_time > VOLUME_CHECK_INTERVAL: # Use constant
-                new_volume = volume_ctrl.get_volume()
-                if abs(new_volume - master_volume_level) > 0.01: # master_volume_level is already scaled
-                    set_system_volume(new_volume) # Pass raw knob value
-                last_volume_check_time = current_time
+            run_due_tasks(periodic_tasks, now)
+            STORY_PLAYBACK.tick(now)
             
-            if IS_RASPBERRY_PI and current_time - last_battery_check_time > 10 : # Only on RPi
-                handle_battery_status(adc, led_manager) 
-                last_battery_check_time = current_time
+            button_event = get_button_event() if button_dirty else BUTTON_NO_EVENT
+            if button_event != BUTTON_NO_EVENT:
+                last_input_time = now
             
-            button_event = button.get_event()
-            
-            if button_event == BUTTON_TAP:
-                if state == STATE_PLAYING:
-                    pygame.mixer.music.pause()
-                    play_pause_sound()
-                    sound_start_time = time.time()
-                    while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0): 
-                        pygame.event.pump()
-                        time.sleep(0.02)
-                    led_manager.set_pattern('breathing', period=2.5)
-                    state = STATE_PAUSED
-                    logger.info("Playback PAUSED")
-                elif state == STATE_PAUSED:
-                    pygame.mixer.music.unpause()
-                    play_resume_sound()
-                    sound_start_time = time.time()
-                    while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0): 
-                        pygame.event.pump()
-                        time.sleep(0.02)
-                    led_manager.set_pattern('solid', state=True)
-                    state = STATE_PLAYING
-                    logger.info("Playback RESUMED")
-
-            elif button_event == BUTTON_DOUBLE_TAP:
-                if current_card_uid and state in [STATE_PLAYING, STATE_PAUSED, STATE_IDLE]:
-                    logger.info("Double tap: Reselecting story for current card.")
-                    stop_bgm()
-                    pygame.mixer.stop()
-                    led_manager.set_loading_pattern()
-                    play_transition_sound()
-                    sound_start_time = time.time()
-                    while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0):
-                        pygame.event.pump()
-                        time.sleep(0.02)
-                    time.sleep(0.3) 
-                    card_data = load_card_stories(current_card_uid)
-                    if card_data and card_data.get("stories"):
-                        stories = card_data["stories"]
-                        selected_story = select_story_for_time(stories, is_calm_time())
-                        current_narration_path = Path(__file__).parent / selected_story["audio"]
-                        current_bgm_tone = selected_story.get("tone", "calmo")
-                        if current_narration_path.exists():
-                            logger.info(f"Playing new story: {selected_story['title']}")
-                            play_narration_with_bgm(current_narration_path, current_bgm_tone)
-                            # play_success_sound() # Part of play_narration_with_bgm or needs careful sequencing
-                            led_manager.set_success_pattern(next_pattern='solid')
-                            state = STATE_PLAYING
-                        else:
-                            logger.error(f"Audio for new story not found: {current_narration_path}")
-                            led_manager.set_error_pattern(count=2)
-                            play_error_sound()
-                            state = STATE_IDLE
-                    else:
-                        logger.warning("No stories for current card on double tap, returning to idle.")
-                        led_manager.set_pattern('solid', state=True)
-                        play_error_sound()
-                        state = STATE_IDLE
-
-            elif button_event == BUTTON_LONG_PRESS:
-                logger.info("Long press: Initiating shutdown.")
-                led_manager.set_shutdown_sequence()
-                play_shutdown_sound()
-                sound_start_time = time.time()
-                while pygame.mixer.get_busy() and (time.time() - sound_start_time < 3.0): # Longer wait for shutdown sound
-                    pygame.event.pump()
-                    time.sleep(0.02)
-                stop_bgm()
-                pygame.mixer.stop()
-                state = STATE_SHUTTING_DOWN
-                continue
+            handler = TRANSITIONS.get((state, button_event))
+            if handler:
+                state = handler(session) or state
+                if state == STATE_SHUTTING_DOWN:
+                    continue
 
-            uid = reader.read_uid()
-            if uid and uid != current_card_uid:
-                logger.info(f"New card {uid} detected. Interrupting current story (if any) and starting new.")
-                last_activity_time = time.time() # Reset activity timer on new card
-                last_story_played_time = time.time() # Reset story played timer
-                stop_bgm()
-                pygame.mixer.stop()
-                current_card_uid = uid
+            card_event, uid = get_card_event()
+            if card_event != CARD_NO_EVENT:
+                last_input_time = now
+            if card_event == CARD_REMOVED:
+                logger.info("Card %s removed.", uid)
+            elif card_event == CARD_PRESENT and uid != session.card_uid:
+                logger.info("New card %s detected. Interrupting current story (if any) and starting new.", uid)
+                last_activity_time = now # Reset activity timer on new card
+                arm_idle_shutdown() # Reset story played timer
+                stop_story()
+                session.card_uid = uid
                 led_manager.set_attention_pattern(count=1)
-                play_transition_sound()
-                sound_start_time = time.time()
-                while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0):
-                    pygame.event.pump()
-                    time.sleep(0.02)
-                time.sleep(0.3)
-
-                if uid in ["000000", "000001", "000002", "000003", "000004"]: # Example UIDs
-                    next_uid_int = int(uid) + 1
-                    if next_uid_int <= 999999: # Ensure it doesn't exceed 6 digits
-                         next_uid = f"{next_uid_int:06d}"
-                         threading.Thread(
-                             target=preload_narration_async, 
-                             args=(next_uid,), 
-                             daemon=True
-                         ).start()
-                card_data = load_card_stories(uid)
-                if not card_data:
-                    logger.error(f"Invalid or missing JSON for card {uid}")
-                    led_manager.set_card_sequence(is_valid=False)
-                    play_card_invalid_sound()
-                    sound_start_time = time.time()
-                    while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0):
-                        pygame.event.pump()
-                        time.sleep(0.02)
-                    time.sleep(0.3)
-                    play_error_sound()
-                    current_card_uid = None
-                    state = STATE_IDLE
-                    continue
-                if not card_data.get("stories"):
-                    logger.warning(f"Empty card: no stories for card {uid}")
-                    led_manager.set_pattern('colorshift', levels=[50, 0, 50, 0], duration=0.2, count=3, next_pattern='breathing')
-                    play_card_invalid_sound()
-                    sound_start_time = time.time()
-                    while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0):
-                        pygame.event.pump()
-                        time.sleep(0.02)
-                    time.sleep(0.3)
-                    play_error_sound()
-                    current_card_uid = None
-                    state = STATE_IDLE
-                    continue
-                current_story_data = card_data["stories"]
-                selected_story = select_story_for_time(current_story_data, is_calm_time())
-                logger.info(f"Selected story: {selected_story['title']} (tone: {selected_story['tone']})")
-                current_narration_path = Path(__file__).parent / selected_story["audio"]
-                current_bgm_tone = selected_story.get("tone", "calmo")
-                if not current_narration_path.exists():
-                    logger.error(f"Audio file not found: {current_narration_path}")
-                    led_manager.set_error_pattern(count=2)
-                    play_card_invalid_sound()
-                    sound_start_time = time.time()
-                    while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0):
-                        pygame.event.pump()
-                        time.sleep(0.02)
-                    time.sleep(0.3)
-                    play_error_sound()
-                    current_card_uid = None
-                    state = STATE_IDLE
-                    continue
-                logger.info(f"Transitioning to PLAYING state")
-                play_card_valid_sound()
-                sound_start_time = time.time()
-                while pygame.mixer.get_busy() and (time.time() - sound_start_time < 2.0):
-                    pygame.event.pump()
-                    time.sleep(0.02)
-                time.sleep(0.3)
-                play_narration_with_bgm(current_narration_path, current_bgm_tone)
-                led_manager.set_card_sequence(is_valid=True)
-                state = STATE_PLAYING
-                last_story_played_time = time.time() # Update when a new story starts
+                # The card cues play while the card is checked; the story starts once they've finished
+                new_state = on_new_card(session)
+                if new_state:
+                    state = new_state
+                    if state == STATE_PLAYING:
+                        arm_idle_shutdown()
 
+            # Breathing is set where IDLE/PAUSED are entered (or via next_pattern), not every iteration
             if state == STATE_IDLE:
-                led_manager.set_pattern('breathing', period=2.5)
-                # Check for idle timeout based on no new story played
-                if IDLE_SHUTDOWN_TIMEOUT_MINUTES > 0: # Only if timeout is set
-                    if (time.time() - last_story_played_time) > (IDLE_SHUTDOWN_TIMEOUT_MINUTES * 60):
-                        logger.info(f"No new story played for {IDLE_SHUTDOWN_TIMEOUT_MINUTES} minutes. Initiating shutdown.")
-                        led_manager.set_shutdown_sequence()
-                        play_shutdown_sound()
-                        sound_start_time = time.time()
-                        while pygame.mixer.get_busy() and (time.time() - sound_start_time < 3.0):
-                            pygame.event.pump()
-                            time.sleep(0.02)
-                        stop_bgm()
-                        pygame.mixer.stop()
-                        state = STATE_SHUTTING_DOWN
-                        continue # Skip to next loop iteration to process shutdown
-
-            elif state == STATE_PLAYING:
-                if not pygame.mixer.music.get_busy() and not pygame.mixer.get_busy(): # Check both music and sound channels
-                    logger.info("Playback finished, returning to IDLE state.")
-                    led_manager.set_pattern('fadeout', duration=1.0, next_pattern='breathing')
-                    state = STATE_IDLE
-                    current_card_uid = None 
+                # Idle timeout based on no new story played (IDLE_SHUTDOWN_EVENT has fired)
+                if idle_shutdown_due:
+                    logger.info("No new story played for %s minutes. Initiating shutdown.", IDLE_SHUTDOWN_TIMEOUT_MINUTES)
+                    led_manager.set_shutdown()
+                    play_shutdown_sound()
+                    wait_for_feedback(3.0)
+                    stop_all()
+                    state = STATE_SHUTTING_DOWN
+                    continue # Skip to next loop iteration to process shutdown
+
             elif state == STATE_PAUSED:
-                led_manager.set_pattern('breathing', period=2.5)
-                # Paused state does not reset last_story_played_time, so it will eventually shut down
+                # Paused state does not re-arm the idle timer, so it will eventually shut down
                 # if no new story is initiated.
                 # If you want pause to keep it alive indefinitely (or reset the timer), 
-                # you would update last_story_played_time here.
+                # you would call arm_idle_shutdown() here.
                 # For now, the behavior is: if paused for longer than IDLE_SHUTDOWN_TIMEOUT_MINUTES 
                 # without a new story being played, it will shut down. This seems reasonable.
+                pass
+
+            if state != prev_state:
+                # LED patterns are set by the handler that made the transition, not re-applied here
+                logger.debug("State: %s -> %s", prev_state, state)
+                # The card stays put during a story, so there's no need to read it at full rate
+                card_poller.set_read_interval(NFC_PLAYING_READ_INTERVAL if state == STATE_PLAYING else 0)
+                prev_state = state
             
-            loop_time = time.time() - loop_start_time_debug
-            sleep_time = max(0.001, MAIN_LOOP_INTERVAL - loop_time) # Use MAIN_LOOP_INTERVAL from config
-            time.sleep(sleep_time)
-            
-            pygame.display.flip() 
-            
-            if time.time() - last_loop_time > 5.0: 
-                # Calculate actual average loop time over the 5s period
-                num_loops_in_5_sec = 5.0 / MAIN_LOOP_INTERVAL # Expected number of loops
-                actual_avg_loop_time_ms = ((time.time() - last_loop_time) / num_loops_in_5_sec) * 1000 if num_loops_in_5_sec > 0 else 0
-                logger.debug(f"Main loop avg time over last 5s: {actual_avg_loop_time_ms:.2f}ms (target: {MAIN_LOOP_INTERVAL*1000:.1f}ms)")
-                last_loop_time = time.time()
+            if debug_enabled:
+                loop_time_ms = (monotonic() - now) * 1000
+                loop_ema_ms += LOOP_EMA_WEIGHT * (loop_time_ms - loop_ema_ms)
+                if now - last_loop_time > LOOP_STATS_INTERVAL:
+                    logger.debug("Main loop EMA: %.2fms", loop_ema_ms)
+                    last_loop_time = now
         
         logger.info("Shutting down...")
+        cleanup()
         if IS_RASPBERRY_PI:
             logger.info("[SIMULATE] os.system('sudo shutdown now')") 
-        
-        if reader: reader.cleanup()
-        if button: button.cleanup()
-        if volume_ctrl: volume_ctrl.cleanup()
-        if IS_RASPBERRY_PI and 'GPIO' in locals() and GPIO: # Ensure GPIO was imported and available
-            GPIO.cleanup()
-            logger.info("[HAL] GPIO.cleanup() called.")
-
-        pygame.quit()
-        logger.info("Pygame quit. Exiting application.")
-        sys.exit(0)
 
     except KeyboardInterrupt:
         logger.info("Manual interruption: exiting program.")
     except Exception as e:
         logger.error(f"Unexpected error in main loop: {e}")
-        logger.debug(f"{traceback.format_exc()}")
+        logger.debug("Traceback:", exc_info=True)
     finally:
-        logger.info("Performing final cleanup...")
-        stop_bgm() 
-        pygame.mixer.stop() 
-
-        if reader: reader.cleanup()
-        if button: button.cleanup()
-        if volume_ctrl: volume_ctrl.cleanup()
-        
-        if IS_RASPBERRY_PI and 'GPIO' in locals() and GPIO: 
-             GPIO.cleanup()
-             logger.info("[HAL] GPIO.cleanup() called in finally.")
+        cleanup()
         logger.info("Application finished.")
 
-def run_with_verification():
+def run_with_verification(audio_buffer=None):
     """Run the application with initial verification"""
     logger.info("Starting Storellai-1 with verification checks")
-    verify_audio_files()
+    # Verification only logs what's missing, so overlap its file walk with audio init instead of delaying boot
+    threading.Thread(target=verify_audio_files, name="verify-audio", daemon=True).start()
     # test_audio_performance()  # Removed performance test to speed up startup
-    main()
+    main(audio_buffer=audio_buffer)
 
 def initialize_hardware():
     """Initialize hardware components with appropriate error handling"""
@@ -496,11 +677,13 @@ def initialize_hardware():
             # GPIO pins from app_config
             from config.app_config import (
                 NFC_SPI_PORT, NFC_SPI_CS_PIN, NFC_IRQ_PIN, NFC_RST_PIN,
-                BUTTON_PIN, LED_PIN, ADC_CHANNEL_VOLUME
+                BUTTON_PIN, LED_PIN, BUTTON_INPUT_DEVICE, ADC_CHANNEL_VOLUME, ADC_SPI_PORT, ADC_SPI_CS
             )
             reader = UIDReader(spi_port=NFC_SPI_PORT, spi_cs_pin=NFC_SPI_CS_PIN, irq_pin=NFC_IRQ_PIN, rst_pin=NFC_RST_PIN)
-            button = Button(button_pin=BUTTON_PIN, led_pin=LED_PIN)
-            volume_ctrl = VolumeControl(adc_channel=ADC_CHANNEL_VOLUME)
+            button = Button(button_pin=BUTTON_PIN, led_pin=LED_PIN, input_device=BUTTON_INPUT_DEVICE)
+            volume_ctrl = VolumeControl(adc_channel=ADC_CHANNEL_VOLUME, spi_port=ADC_SPI_PORT, spi_cs=ADC_SPI_CS)
+            # Imported here so startup (and mock runs) don't pay for the Adafruit stack up front
+            from adafruit_mcp3xxx.analog_in import AnalogIn
             adc = AnalogIn()  # Initialize MCP3008 ADC
         else:
             reader = UIDReader()
@@ -512,7 +695,7 @@ def initialize_hardware():
         
     except Exception as e:
         logger.error(f"Hardware initialization error: {e}")
-        logger.debug(traceback.format_exc())
+        logger.debug("Traceback:", exc_info=True)
         # Return what we have - main() will check for None values
         return reader, button, volume_ctrl, adc
 
@@ -523,12 +706,22 @@ def background_preload():
         background_loading_active = True
         logger.info("Starting background preloading...")
         
+        # Feedback cues first: they're small and the next tap needs them
+        preload_feedback_sounds()
+        
         # Preload common card data
         preload_card_data()
         
-        # Preload narration for first few cards (adjust number as needed)
-        for uid in ["000000", "000001", "000002"]:
-            preload_narration_async(uid)
+        # Start SD card readahead for every audio file before the slow decodes below
+        prewarm_audio_files()
+        
+        # BGM decoding is slow, so it happens here rather than on the boot path
+        preload_start = time.time()
+        preload_bgm()
+        logger.info(f"BGM preloading took {(time.time() - preload_start)*1000:.1f}ms")
+        
+        # Decode narrations for every card so taps don't hit the SD card
+        preload_all_narrations()
             
         logger.info("Background preloading completed")
     except Exception as e:
@@ -536,6 +729,38 @@ def background_preload():
     finally:
         background_loading_active = False
 
+def run_led_thread(led_manager):
+    """LED thread body: raise to real-time priority on the Pi, then drive the LED patterns"""
+    if IS_RASPBERRY_PI:
+        set_realtime_priority(LED_THREAD_RT_PRIORITY)
+    led_manager.run(LED_UPDATE_INTERVAL)
+
+def run_volume_sampler(volume_ctrl, stop_event):
+    """
+    Read the volume knob every VOLUME_CHECK_INTERVAL until stop_event is set.
+    Posts VOLUME_CHANGED_EVENT with the new level only when it moves by more than
+    VOLUME_DEADBAND, so the main loop never waits on the ADC and ignores pot noise.
+    """
+    while not stop_event.wait(VOLUME_CHECK_INTERVAL):
+        try:
+            level = volume_ctrl.get_volume_if_changed(VOLUME_DEADBAND)
+        except Exception as e:
+            logger.error(f"Volume knob read failed: {e}")
+            continue
+        if level is not None:
+            pygame.event.post(pygame.event.Event(VOLUME_CHANGED_EVENT, level=level))
+
+def run_due_tasks(tasks, now):
+    """Run every periodic task whose deadline has passed and schedule its next run"""
+    while tasks[0][0] <= now:
+        _, order, interval, callback = tasks[0]
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Periodic task {callback.__name__} failed: {e}")
+        # Reschedule from now rather than the missed deadline so a stall doesn't cause a burst
+        heapq.heapreplace(tasks, (now + interval, order, interval, callback))
+
 def handle_error(led_manager, error_type="general", message=None):
     """
     Handle different types of errors with appropriate LED feedback and logging.
@@ -554,7 +779,7 @@ def handle_error(led_manager, error_type="general", message=None):
     # Different LED patterns for different error types
     if error_type == "card":
         # Card read error - pulsing red pattern
-        led_manager.set_pattern('colorshift', levels=[100, 0, 100, 0], duration=0.2, count=3, next_pattern='breathing')
+        led_manager.apply(FLASH_CARD_ERROR)
     elif error_type == "audio":
         # Audio error - error pattern
         led_manager.set_error_pattern(count=2)
@@ -563,7 +788,7 @@ def handle_error(led_manager, error_type="general", message=None):
         led_manager.set_sos(count=1, next_pattern='breathing')
     elif error_type == "network":
         # Network connectivity error - slow pulse
-        led_manager.set_pattern('pulse', count=3, next_pattern='breathing')
+        led_manager.apply(PULSE_NETWORK_ERROR)
     elif error_type == "battery":
         # Battery error - custom pattern based on severity
         level = message if isinstance(message, int) else 15
@@ -578,8 +803,20 @@ def handle_error(led_manager, error_type="general", message=None):
 if __name__ == "__main__":
     # Skip verification during normal operation for faster startup
     # To run with verification: python box.py --verify
-    import sys
-    if "--verify" in sys.argv:
-        run_with_verification()
+    # To tune output latency: python box.py --audio-latency-ms 20
+    import argparse
+    from config.app_config import latency_to_buffer
+    parser = argparse.ArgumentParser(description="Storyteller Box")
+    parser.add_argument("--verify", action="store_true", help="verify audio files before starting")
+    parser.add_argument("--audio-latency-ms", type=float, default=None,
+                        help="mixer buffer latency in milliseconds (rounded to a power-of-two sample count)")
+    args = parser.parse_args()
+    audio_buffer = None
+    if args.audio_latency_ms is not None:
+        audio_buffer = latency_to_buffer(args.audio_latency_ms)
+        if audio_buffer is None:
+            parser.error("--audio-latency-ms must be a positive number of milliseconds")
+    if args.verify:
+        run_with_verification(audio_buffer=audio_buffer)
     else:
-        main()
\ No newline at end of file
+        main(audio_buffer=audio_buffer)
\ No newline at end of file
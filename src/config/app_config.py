@@ -4,19 +4,67 @@ Application configuration for Storyteller Box.
 Contains all constants, paths, and hardware pin assignments.
 """
 
+import logging
+import math
+import os
 from pathlib import Path
 
 # ============ PATH CONSTANTS ============
-BASE_DIR = Path(__file__).parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent  # Absolute, so cached story paths survive a chdir
 AUDIO_FOLDER = BASE_DIR / "audio"
 BGM_FOLDER = BASE_DIR / "bgm"
+# BGM loop formats in order of preference; tools/transcode_assets.py writes the faster-to-decode ones
+BGM_EXTENSIONS = (".wav", ".ogg", ".mp3")
 STORIES_FOLDER = BASE_DIR / "storiesoffline"
 
 # ============ AUDIO SETTINGS ============
 AUDIO_FREQUENCY = 44100
-AUDIO_BUFFER = 4096  # Increased from 2048
+# Mixer buffer in samples; latency per buffer is AUDIO_BUFFER / AUDIO_FREQUENCY (512 ~= 12ms)
+AUDIO_BUFFER_LOW_LATENCY = 512  # Reduced from 4096 (~93ms) to cut narration start latency
+# Single-core boards (Pi Zero) underrun with small buffers while Python is busy, so trade latency for stability
+AUDIO_BUFFER_SINGLE_CORE = 4096
+AUDIO_BUFFER = AUDIO_BUFFER_LOW_LATENCY if (os.cpu_count() or 1) > 1 else AUDIO_BUFFER_SINGLE_CORE
+
+
+def latency_to_buffer(latency_ms):
+    """
+    Convert a target output latency to a mixer buffer size: the nearest power of two
+    samples, clamped to 256-32768 (SDL counts buffer samples in 16 bits).
+    Returns None when latency_ms isn't a positive number of milliseconds.
+    """
+    try:
+        samples = float(latency_ms) * AUDIO_FREQUENCY / 1000
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(samples) or samples <= 0:
+        return None
+    return 2 ** min(15, max(8, round(math.log2(samples))))
+
+
+# STORYTELLER_AUDIO_LATENCY_MS overrides the buffer, so a box that underruns (or a PipeWire
+# setup that wants a larger quantum) can be tuned without a code change. Every module imports
+# this one, so a bad value only logs a warning instead of crash-looping the service.
+_latency_ms = os.environ.get("STORYTELLER_AUDIO_LATENCY_MS")
+if _latency_ms:
+    _latency_buffer = latency_to_buffer(_latency_ms)
+    if _latency_buffer is None:
+        logging.getLogger("storyteller.config").warning(
+            "Ignoring STORYTELLER_AUDIO_LATENCY_MS=%r (expected a positive number of milliseconds), "
+            "using a %d-sample buffer", _latency_ms, AUDIO_BUFFER)
+    else:
+        AUDIO_BUFFER = _latency_buffer
 AUDIO_CHANNELS = 2
 MAX_AUDIO_CHANNELS = 8
+# Mixer channel reserved for narration playback
+NARRATION_CHANNEL_ID = 0
+# Mixer channel for UI feedback sounds (taps, card cues); its end event drives the follow-up steps
+FEEDBACK_CHANNEL_ID = 1
+# Mixer channel for story BGM once its loop is decoded into BGM_CACHE (the music stream is the fallback)
+BGM_CHANNEL_ID = 2
+# Pause between a feedback sound ending and the cue or story that follows it (in milliseconds)
+FEEDBACK_GAP_MS = 300
+# Upper bound on decoded narration kept in memory (16-bit PCM, ~10MB per stereo minute)
+NARRATION_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 # ============ VOLUME SETTINGS ============
 MIN_SOFTWARE_VOLUME = 0.1
@@ -38,18 +86,46 @@ NFC_SPI_PORT = 0
 NFC_SPI_CS_PIN = 0  # CE0 for SPI0
 NFC_IRQ_PIN = 25    # Example
 NFC_RST_PIN = 17    # Example
+# Consecutive identical reads before a card counts as present, and empty reads before it counts as removed
+NFC_CONFIRM_READS = 2
+NFC_REMOVAL_MISSES = 3
+# A single NFC read taking longer than this (in seconds) is treated as a wedged reader and polling is restarted
+NFC_READ_STALL_TIMEOUT = 5
+NFC_WATCHDOG_INTERVAL = 1
+# Gap between NFC reads while a story plays (~5 Hz), leaving the shared SPI bus to the ADC
+NFC_PLAYING_READ_INTERVAL = 0.2
 BUTTON_PIN = 23
 LED_PIN = 24
+# Kernel-debounced button via the gpio-key overlay (see DEPLOYMENT_GUIDE.md);
+# None reads BUTTON_PIN directly and debounces in Python. Requires the evdev package.
+BUTTON_INPUT_DEVICE = None  # e.g. "/dev/input/by-path/platform-button@17-event"
 ADC_CHANNEL_VOLUME = 0  # MCP3008 channel for volume pot
+ADC_SPI_PORT = 0
+ADC_SPI_CS = 1  # CE1 for SPI0 (CE0 is the NFC reader)
 
 # ============ TIMING SETTINGS ============
 CALM_TIME_START = (20, 30)  # 20:30
 CALM_TIME_END = (6, 30)     # 6:30
-# Interval for checking volume changes (in seconds)
-VOLUME_CHECK_INTERVAL = 1
+# Interval for sampling the volume knob (in seconds), on its own thread
+VOLUME_CHECK_INTERVAL = 0.5
+# Change in the (IIR-smoothed) knob level needed to touch the mixer volume
+VOLUME_DEADBAND = 0.03
+
+# Interval for checking battery status (in seconds, Raspberry Pi only)
+BATTERY_CHECK_INTERVAL = 10
+# Polling interval while a button press sequence is being resolved (in seconds)
+BUTTON_POLL_INTERVAL = 0.02
+# Relaxed polling interval during playback once there has been no input for INPUT_IDLE_TIMEOUT seconds
+IDLE_POLL_INTERVAL = 0.2
+INPUT_IDLE_TIMEOUT = 5
+# LED animation frame interval (in seconds), runs on its own thread
+LED_UPDATE_INTERVAL = 1 / 30
 
-# Main loop update interval (in milliseconds)
-MAIN_LOOP_INTERVAL = 100
+# SCHED_FIFO priorities for the SDL audio, LED and main threads on Raspberry Pi (needs CAP_SYS_NICE)
+AUDIO_THREAD_RT_PRIORITY = 10
+LED_THREAD_RT_PRIORITY = 5
+# Main loop, below audio and LED so playback never waits on Python (falls back to nice -10)
+MAIN_THREAD_RT_PRIORITY = 2
 
 # Idle shutdown timeout (in minutes)
 IDLE_SHUTDOWN_TIMEOUT_MINUTES = 30  # Auto-shutdown after X minutes of inactivity (no new story played)
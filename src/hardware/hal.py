@@ -9,8 +9,23 @@ Provides both real (Raspberry Pi) and mock classes for:
 Allows seamless switching between real hardware and mock/testing environments.
 """
 
+import logging
 import time
+import queue
 import random
+import threading
+try:
+    import evdev  # Optional: kernel-debounced button through the gpio-key overlay
+except ImportError:
+    evdev = None
+try:
+    import spidev  # Direct SPI access for the volume ADC
+except ImportError:
+    spidev = None
+# Child of the app's "storyteller" logger, so HAL messages reach its handlers without
+# importing utils (tests import this module as src.hardware.hal)
+logger = logging.getLogger("storyteller.hal")
+
 # Attempt to import Raspberry Pi specific libraries
 IS_RASPBERRY_PI = True  # Force real hardware usage
 try:
@@ -24,7 +39,7 @@ try:
     from adafruit_mcp3xxx.analog_in import AnalogIn as RealAnalogIn # Import real AnalogIn
 
     IS_RASPBERRY_PI = True
-    print("[HAL] Raspberry Pi environment detected and real ADC libraries imported.")
+    logger.info("[HAL] Raspberry Pi environment detected and real ADC libraries imported.")
 
     # This class, when instantiated, returns a configured MCP3008 chip object
     class MCP3008_HAL_Real_Provider:
@@ -42,28 +57,28 @@ try:
                 try:
                     cs = digitalio.DigitalInOut(getattr(board, cs_pin_name))
                 except AttributeError:
-                    print(f"[HAL_ERROR] CS pin {cs_pin_name} not found on board. Using D5 as fallback.")
+                    logger.error(f"[HAL_ERROR] CS pin {cs_pin_name} not found on board. Using D5 as fallback.")
                     cs = digitalio.DigitalInOut(board.D5) # Fallback, ensure this is valid
                 
                 cls._mcp_chip_instance = ADConverter_MCP3008_Chip.MCP3008(spi, cs)
-                print(f"[HAL] Real MCP3008 chip initialized on SPI with CS pin {cs_pin_name}.")
+                logger.info(f"[HAL] Real MCP3008 chip initialized on SPI with CS pin {cs_pin_name}.")
             return cls._mcp_chip_instance
 
     MCP3008 = MCP3008_HAL_Real_Provider # Export this class/factory
     AnalogIn = RealAnalogIn # Export real AnalogIn
 
 except ImportError as e:
-    print(f"[HAL] ImportError during RPi setup: {e}. Using Mocks for ADC.")
+    logger.info(f"[HAL] ImportError during RPi setup: {e}. Using Mocks for ADC.")
     IS_RASPBERRY_PI = False 
 except RuntimeError as e:
-    print(f"[HAL] RuntimeError during RPi setup (likely RPi.GPIO): {e}. Using Mocks for ADC.")
+    logger.info(f"[HAL] RuntimeError during RPi setup (likely RPi.GPIO): {e}. Using Mocks for ADC.")
     IS_RASPBERRY_PI = False
 
 if not IS_RASPBERRY_PI:
     # This block executes on macOS or if RPi library imports fail
     class MockMCP3008_HAL_EmulatedChip:
         def __init__(self): # Called by MCP3008() in time_utils.py
-            print("[HAL_Mock] MockMCP3008_HAL_EmulatedChip object created (simulates MCP3008 chip).")
+            logger.info("[HAL_Mock] MockMCP3008_HAL_EmulatedChip object created (simulates MCP3008 chip).")
             self.bits = 10 # MCP3008 is 10-bit
             self.reference_voltage = 3.3 # Common Vref, used by AnalogIn
 
@@ -76,11 +91,11 @@ if not IS_RASPBERRY_PI:
                 # Raw ADC value = (voltage_at_pin / adc_reference_voltage) * (2^adc_bits - 1)
                 # Raw value = (1.85V / 3.3V) * 1023 = 0.5606 * 1023 = 573.4 ~= 573
                 raw_value = 573 
-                print(f"[HAL_Mock] MockMCP3008: Reading pin {pin_index} (battery), returning raw value {raw_value}.")
+                logger.debug("[HAL_Mock] MockMCP3008: Reading pin %s (battery), returning raw value %s.", pin_index, raw_value)
             else:
                 # For other pins, return a default mock value, e.g., mid-scale
                 raw_value = 512 
-                print(f"[HAL_Mock] MockMCP3008: Reading pin {pin_index}, returning default raw value {raw_value}.")
+                logger.debug("[HAL_Mock] MockMCP3008: Reading pin %s, returning default raw value %s.", pin_index, raw_value)
             return raw_value
             
     MCP3008 = MockMCP3008_HAL_EmulatedChip # Export the mock class under the name MCP3008
@@ -90,7 +105,7 @@ if not IS_RASPBERRY_PI:
             self._mcp = mcp_chip_instance
             self._pin_number = pin_number
             self._is_differential = is_differential
-            print(f"[HAL_Mock] MockAnalogIn created for pin {pin_number} on mock MCP chip: {type(self._mcp)}.")
+            logger.info(f"[HAL_Mock] MockAnalogIn created for pin {pin_number} on mock MCP chip: {type(self._mcp)}.")
 
         @property
         def value(self):
@@ -100,7 +115,7 @@ if not IS_RASPBERRY_PI:
         @property
         def voltage(self):
             if not hasattr(self._mcp, 'bits') or not hasattr(self._mcp, 'reference_voltage'):
-                print("[HAL_Mock_ERROR] MockMCP chip instance is missing 'bits' or 'reference_voltage' attributes.")
+                logger.error("[HAL_Mock_ERROR] MockMCP chip instance is missing 'bits' or 'reference_voltage' attributes.")
                 return 0.0 
             
             val = self.value 
@@ -109,7 +124,7 @@ if not IS_RASPBERRY_PI:
             max_adc_val = (2**num_bits) - 1
 
             if max_adc_val == 0: # Should not happen with self.bits = 10
-                print("[HAL_Mock_ERROR] Max ADC value is zero (bits might be zero). Cannot calculate voltage.")
+                logger.error("[HAL_Mock_ERROR] Max ADC value is zero (bits might be zero). Cannot calculate voltage.")
                 return 0.0
 
             calculated_voltage = (val * ref_voltage) / max_adc_val
@@ -123,26 +138,196 @@ BUTTON_TAP = 1
 BUTTON_DOUBLE_TAP = 2
 BUTTON_LONG_PRESS = 3
 
+# Card presence event types reported by CardPresenceFilter
+CARD_NO_EVENT = 0
+CARD_PRESENT = 1
+CARD_REMOVED = 2
+
+class CardPresenceFilter:
+    """
+    Debounces raw NFC reads. A card is reported once the same UID has been read on
+    confirm_reads consecutive polls, and reported removed after removal_misses
+    consecutive empty polls, so a reader that misses a resting tag on alternate
+    polls doesn't produce false removals and re-detections.
+    """
+    def __init__(self, confirm_reads: int = 2, removal_misses: int = 3) -> None:
+        self.confirm_reads = confirm_reads
+        self.removal_misses = removal_misses
+        self.present_uid: str | None = None
+        self._candidate_uid: str | None = None
+        self._candidate_reads = 0
+        self._misses = 0
+
+    def update(self, uid: str | None) -> tuple[int, str | None]:
+        """Feed one raw read. Returns (CARD_* event, uid the event refers to)."""
+        if uid is None:
+            self._candidate_uid = None
+            self._candidate_reads = 0
+            if self.present_uid is None:
+                return CARD_NO_EVENT, None
+            self._misses += 1
+            if self._misses < self.removal_misses:
+                return CARD_NO_EVENT, None
+            removed_uid, self.present_uid = self.present_uid, None
+            self._misses = 0
+            return CARD_REMOVED, removed_uid
+
+        self._misses = 0
+        if uid == self.present_uid:
+            self._candidate_uid = None
+            self._candidate_reads = 0
+            return CARD_NO_EVENT, None
+        if uid == self._candidate_uid:
+            self._candidate_reads += 1
+        else:
+            self._candidate_uid = uid
+            self._candidate_reads = 1
+        if self._candidate_reads < self.confirm_reads:
+            return CARD_NO_EVENT, None
+        self.present_uid = uid
+        self._candidate_uid = None
+        self._candidate_reads = 0
+        return CARD_PRESENT, uid
+
+class CardPoller:
+    """
+    Reads a UID reader on its own thread so slow or stuck SPI reads never block the
+    main loop. Reads are debounced through a CardPresenceFilter and only resulting
+    card events are queued; main_wake (anything with set()) is set whenever one is.
+    If a single read hangs longer than stall_timeout, check_watchdog() abandons that
+    thread and starts a new one, doubling the allowance each time until a read completes
+    so a wedged reader doesn't leak a thread every few seconds.
+    set_read_interval() spaces reads out (e.g. during playback) to keep SPI traffic down.
+    """
+    def __init__(self, reader, card_filter: CardPresenceFilter, main_wake=None,
+                 stall_timeout: float = 5.0, idle_timeout: float = 1.0, thread_init=None) -> None:
+        self.reader = reader
+        self.card_filter = card_filter
+        self.stall_timeout = stall_timeout
+        self.idle_timeout = idle_timeout # Upper bound on waiting for an IRQ, in case an edge is missed
+        self._main_wake = main_wake
+        # Called first on each polling thread; the watchdog restarts it from the (possibly elevated) main loop
+        self._thread_init = thread_init
+        self._events: queue.SimpleQueue = queue.SimpleQueue()
+        self._card_wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._generation = 0
+        self._read_started: float | None = None # Monotonic start of the read in progress
+        self._stall_limit = stall_timeout
+        self._read_interval = 0.0 # Minimum gap between reads, in seconds
+        self._throttle_wake = threading.Event()
+        self.reader.attach_wakeup(self._card_wake)
+
+    def start(self) -> None:
+        self._generation += 1
+        threading.Thread(target=self._run, args=(self._generation,), name="nfc-poller", daemon=True).start()
+
+    def _run(self, generation: int) -> None:
+        if self._thread_init is not None:
+            self._thread_init()
+        while not self._stop_event.is_set():
+            if not self.reader.card_pending():
+                self._card_wake.wait(self.idle_timeout)
+                self._card_wake.clear()
+                continue
+            self._read_started = time.monotonic()
+            try:
+                uid = self.reader.read_uid()
+            except Exception as e:
+                logger.error(f"[HAL_ERROR] CardPoller: read_uid() failed: {e}")
+                uid = None
+            if generation != self._generation:
+                return # The watchdog replaced this thread while the read was stuck
+            self._read_started = None
+            self._stall_limit = self.stall_timeout
+            event, uid = self.card_filter.update(uid)
+            if event != CARD_NO_EVENT:
+                self._events.put((event, uid))
+                if self._main_wake is not None:
+                    self._main_wake.set()
+            if self._read_interval:
+                self._throttle_wake.wait(self._read_interval)
+                self._throttle_wake.clear()
+
+    def set_read_interval(self, seconds: float) -> None:
+        """Wait at least this long between reads (0 reads as fast as the reader allows)"""
+        if seconds != self._read_interval:
+            self._read_interval = seconds
+            self._throttle_wake.set() # Don't sit out the rest of a longer gap
+
+    def check_watchdog(self) -> bool:
+        """Restart the polling thread if a read has been stuck too long. Returns True if it did."""
+        started = self._read_started
+        if started is None or time.monotonic() - started < self._stall_limit:
+            return False
+        logger.error(f"[HAL_ERROR] CardPoller: read stuck for over {self._stall_limit:.0f}s, restarting NFC polling")
+        self._read_started = None
+        self._stall_limit *= 2
+        self.start()
+        return True
+
+    def get_event(self) -> tuple[int, str | None]:
+        """Return the next queued (CARD_* event, uid), or (CARD_NO_EVENT, None). Never blocks."""
+        try:
+            event = self._events.get_nowait()
+        except queue.Empty:
+            return CARD_NO_EVENT, None
+        if self._main_wake is not None and not self._events.empty():
+            self._main_wake.set() # More queued; make sure the main loop comes back for them
+        return event
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._card_wake.set()
+        self._throttle_wake.set()
+
 class MockUIDReader:
     """
     Mock NFC UID reader for development/testing without hardware.
     Simulates 10 unique UIDs, cycles through them on each read.
+    A card "arrives" 1-2 seconds after the previous read, and a timer stands in
+    for the IRQ line so the main loop is woken instead of blocking in read_uid().
     """
     def __init__(self) -> None:
         # 10 unique UIDs
         self.uids: list[str] = [f"{i:06d}" for i in range(10)]
         self.index: int = 0
+        self._next_card_time = time.monotonic() + random.uniform(1, 2)
+        self._wake_event = None
+        self._wake_timer = None
 
     def read_uid(self) -> str:
-        # Simulate reading a card after 1-2 seconds
-        time.sleep(random.uniform(1, 2))
+        # Simulate reading a card 1-2 seconds after the previous one
+        delay = self._next_card_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
         uid = self.uids[self.index]
-        print(f"[HAL_Mock] Card detected! UID={uid}")
+        logger.debug("[HAL_Mock] Card detected! UID=%s", uid)
         self.index = (self.index + 1) % len(self.uids)
+        self._next_card_time = time.monotonic() + random.uniform(1, 2)
+        self._arm_wakeup()
         return uid
 
+    def _arm_wakeup(self) -> None:
+        if self._wake_event is None:
+            return
+        delay = max(0.0, self._next_card_time - time.monotonic())
+        self._wake_timer = threading.Timer(delay, self._wake_event.set)
+        self._wake_timer.daemon = True
+        self._wake_timer.start()
+
+    def attach_wakeup(self, wake_event) -> None:
+        # Simulated IRQ: wake the main loop when the next card arrives
+        self._wake_event = wake_event
+        self._arm_wakeup()
+
+    def card_pending(self) -> bool:
+        return time.monotonic() >= self._next_card_time
+
     def cleanup(self) -> None:
-        print("[HAL_Mock] MockUIDReader cleanup.")
+        if self._wake_timer is not None:
+            self._wake_timer.cancel()
+        logger.info("[HAL_Mock] MockUIDReader cleanup.")
 
 class MockButton:
     """
@@ -150,7 +335,7 @@ class MockButton:
     Simulates button events and LED state, including PWM for breathing/blink effects.
     """
     def __init__(self, button_pin=None, led_pin=None, long_press_duration=1.5, double_tap_window=0.3) -> None:
-        print(f"[HAL_Mock] Initialized MockButton (Pin: {button_pin}, LED: {led_pin})")
+        logger.info(f"[HAL_Mock] Initialized MockButton (Pin: {button_pin}, LED: {led_pin})")
         self._led_state: bool = False
         self._led_pwm_active: bool = False
         self._led_pwm_dc: float = 0
@@ -169,38 +354,57 @@ class MockButton:
             self._last_event_time = time.monotonic()
             evt = random.choice([BUTTON_NO_EVENT, BUTTON_TAP, BUTTON_DOUBLE_TAP, BUTTON_LONG_PRESS, BUTTON_NO_EVENT, BUTTON_NO_EVENT])
             if evt != BUTTON_NO_EVENT:
-                print(f"[HAL_Mock] MockButton: Simulated event {evt}")
+                logger.debug("[HAL_Mock] MockButton: Simulated event %s", evt)
                 return evt
         return BUTTON_NO_EVENT
 
+    def attach_wakeup(self, wake_event) -> None:
+        # No GPIO edges on the mock button; events are generated when polled
+        pass
+
+    def needs_polling(self) -> bool:
+        # Simulated events are time based, so the mock is always polled
+        return True
+
     def set_led(self, state: bool) -> None:
         self._led_pwm_active = False
         self._led_state = bool(state)
-        print(f"[HAL_Mock] MockButton: LED set to {'ON' if self._led_state else 'OFF'} (PWM disabled)")
+        logger.debug("[HAL_Mock] MockButton: LED set to %s (PWM disabled)", 'ON' if self._led_state else 'OFF')
 
     def start_led_pwm(self, duty_cycle_percent: float, frequency: int = 50) -> None:
         self._led_state = True # Consider LED on
         self._led_pwm_active = True
         self._led_pwm_dc = duty_cycle_percent
-        print(f"[HAL_Mock] MockButton: LED PWM started at {frequency}Hz, {duty_cycle_percent}% duty cycle.")
+        logger.info(f"[HAL_Mock] MockButton: LED PWM started at {frequency}Hz, {duty_cycle_percent}% duty cycle.")
 
     def stop_led_pwm(self) -> None:
         self._led_pwm_active = False
         self._led_state = False
-        print(f"[HAL_Mock] MockButton: LED PWM stopped, LED OFF.")
+        logger.info(f"[HAL_Mock] MockButton: LED PWM stopped, LED OFF.")
 
     def change_led_pwm_duty_cycle(self, duty_cycle_percent: float) -> None:
         if self._led_pwm_active:
             self._led_pwm_dc = duty_cycle_percent
-            print(f"[HAL_Mock] MockButton: LED PWM duty cycle changed to {duty_cycle_percent}%.")
+            logger.debug("[HAL_Mock] MockButton: LED PWM duty cycle changed to %s%%.", duty_cycle_percent)
         else:
-            print(f"[HAL_Mock] MockButton: PWM not active, cannot change duty cycle.")
+            logger.debug("[HAL_Mock] MockButton: PWM not active, cannot change duty cycle.")
 
     def get_led_state(self) -> bool:
         return self._led_state
 
     def cleanup(self) -> None:
-        print("[HAL_Mock] MockButton cleanup.")
+        logger.info("[HAL_Mock] MockButton cleanup.")
+
+def _volume_if_changed(volume_ctrl, threshold):
+    """
+    Shared get_volume_if_changed() body: read the knob and return the level only when it has
+    moved more than threshold since the last level returned, otherwise None.
+    """
+    level = volume_ctrl.get_volume()
+    if volume_ctrl._reported is not None and abs(level - volume_ctrl._reported) <= threshold:
+        return None
+    volume_ctrl._reported = level
+    return level
 
 class MockVolumeControl:
     """
@@ -208,17 +412,21 @@ class MockVolumeControl:
     Simulates a volume knob (returns a fixed or changing value).
     """
     def __init__(self, adc_channel=None, spi_port=None, spi_cs=None):
-        print(f"[HAL_Mock] Initialized MockVolumeControl (ADC Channel: {adc_channel})")
+        logger.info(f"[HAL_Mock] Initialized MockVolumeControl (ADC Channel: {adc_channel})")
         self._volume = 0.75 # Default mock volume
+        self._reported = None
 
     def get_volume(self):
         # Simulate volume changes for testing
         # self._volume = (self._volume + 0.1) % 1.0 
-        print(f"[HAL_Mock] MockVolumeControl: Current volume {self._volume:.2f}")
+        logger.debug("[HAL_Mock] MockVolumeControl: Current volume %.2f", self._volume)
         return self._volume
 
+    def get_volume_if_changed(self, threshold):
+        return _volume_if_changed(self, threshold)
+
     def cleanup(self):
-        print("[HAL_Mock] MockVolumeControl cleanup.")
+        logger.info("[HAL_Mock] MockVolumeControl cleanup.")
 
 
 if IS_RASPBERRY_PI:
@@ -234,8 +442,34 @@ if IS_RASPBERRY_PI:
             # self.pn532 = PN532_SPI(cs=spi_cs_pin, irq=irq_pin, reset=rst_pin) # spi_port might be implicit
             # self.pn532.SAM_configuration()
             # print(f"[HAL] Initialized RealUIDReader (SPI{spi_port}-CS{spi_cs_pin})")
-            print(f"[HAL] RealUIDReader initialized (NOT IMPLEMENTED) SPI{spi_port}-CS{spi_cs_pin}, IRQ:{irq_pin}, RST:{rst_pin}")
+            logger.info(f"[HAL] RealUIDReader initialized (NOT IMPLEMENTED) SPI{spi_port}-CS{spi_cs_pin}, IRQ:{irq_pin}, RST:{rst_pin}")
+            self.irq_pin = irq_pin
+            self._irq_event = threading.Event()
+            if self.irq_pin is not None:
+                # PN532 pulls IRQ low when a target response is ready
+                GPIO.setmode(GPIO.BCM)
+                GPIO.setup(self.irq_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+        def attach_wakeup(self, wake_event):
+            """Wake the main loop on a falling edge of the NFC IRQ line."""
+            if self.irq_pin is None:
+                return
 
+            def _on_irq(_channel):
+                self._irq_event.set()
+                wake_event.set()
+
+            GPIO.add_event_detect(self.irq_pin, GPIO.FALLING, callback=_on_irq)
+            logger.info(f"[HAL] RealUIDReader: IRQ wakeup enabled on GPIO {self.irq_pin}")
+
+        def card_pending(self):
+            """Return True if read_uid() should be called (IRQ fired, or no IRQ line to wait on)."""
+            if self.irq_pin is None:
+                return True
+            if self._irq_event.is_set():
+                self._irq_event.clear()
+                return True
+            return False
 
         def read_uid(self):
             # uid_bytes = self.pn532.read_passive_target(timeout=0.5) # ms or s depends on lib
@@ -245,19 +479,19 @@ if IS_RASPBERRY_PI:
             # uid_string = "".join([format(i, "02x") for i in uid_bytes])
             # print(f"[HAL] RealUIDReader: Card detected! UID={uid_string}")
             # return uid_string
-            print("[HAL] RealUIDReader: read_uid() called (NOT IMPLEMENTED)")
+            logger.debug("[HAL] RealUIDReader: read_uid() called (NOT IMPLEMENTED)")
             time.sleep(1) # Simulate scan delay
             # Simulate finding a card occasionally for testing purposes
             if random.random() < 0.3: # 30% chance to "find" a card
                 found_uid = f"{random.randint(0,999999):06d}"
-                print(f"[HAL] RealUIDReader: Simulated card found UID={found_uid}")
+                logger.debug("[HAL] RealUIDReader: Simulated card found UID=%s", found_uid)
                 return found_uid
             return None
 
 
         def cleanup(self):
             # Specific cleanup for the NFC reader if needed
-            print("[HAL] RealUIDReader cleanup.")
+            logger.info("[HAL] RealUIDReader cleanup.")
             pass
 
     class RealButton:
@@ -266,7 +500,9 @@ if IS_RASPBERRY_PI:
         - Handles tap, double-tap, long-press detection with debouncing
         - Supports PWM for breathing/blink LED patterns
         """
-        def __init__(self, button_pin, led_pin=None, long_press_duration=1.5, double_tap_window=0.3, debounce_time=0.05):
+        def __init__(self, button_pin: int, led_pin: int | None = None, long_press_duration: float = 1.5,
+                     double_tap_window: float = 0.3, debounce_time: float = 0.05,
+                     input_device: str | None = None) -> None:
             self.button_pin = button_pin
             self.led_pin = led_pin
             self.long_press_duration = long_press_duration
@@ -287,235 +523,37 @@ if IS_RASPBERRY_PI:
             self._first_press_time = 0
             self._first_release_time = 0
 
+            # Kernel input device (gpio-key overlay), if configured and evdev is available
+            self._input_device = None
+            self._key_events = queue.SimpleQueue()
+            self._key_level = GPIO.HIGH
+            self._wake_event = None
+
             GPIO.setmode(GPIO.BCM) # Use Broadcom pin numbering
-            GPIO.setup(self.button_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            if input_device and evdev is not None:
+                # The kernel owns the pin and debounces it; don't claim it through RPi.GPIO
+                self._input_device = evdev.InputDevice(input_device)
+                self._input_device.grab()
+                self.debounce_time = 0
+                threading.Thread(target=self._read_input_events, daemon=True).start()
+                logger.info(f"[HAL] RealButton reading kernel-debounced events from {input_device}")
+            else:
+                if input_device:
+                    logger.info("[HAL] evdev not installed, falling back to GPIO polling for the button")
+                GPIO.setup(self.button_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
             
             if self.led_pin:
                 GPIO.setup(self.led_pin, GPIO.OUT)
                 GPIO.output(self.led_pin, GPIO.LOW) # LED off initially
-            print(f"[HAL] Initialized RealButton on GPIO {self.button_pin} (LED: {self.led_pin}, Debounce: {self.debounce_time*1000:.0f}ms)")
+            logger.info(f"[HAL] Initialized RealButton on GPIO {self.button_pin} (LED: {self.led_pin}, Debounce: {self.debounce_time*1000:.0f}ms)")
 
-        def _stop_pwm_if_active(self):
+        def _stop_pwm_if_active(self) -> None:
             if self.pwm_instance:
                 self.pwm_instance.stop()
                 self.pwm_instance = None
                 # print("[HAL_DEBUG] PWM stopped.")
 
-        def set_led(self, state):
-            if self.led_pin:
-                self._stop_pwm_if_active()
-                new_gpio_state = GPIO.HIGH if state else GPIO.LOW
-                GPIO.output(self.led_pin, new_gpio_state)
-                self._led_state = bool(state)
-                # print(f"[HAL] RealButton: LED set to {'ON' if self._led_state else 'OFF'}")
-
-        def start_led_pwm(self, duty_cycle_percent, frequency=None):
-            if not self.led_pin:
-                return
-            self._stop_pwm_if_active() # Stop any existing PWM or solid state
-            
-            active_frequency = frequency if frequency is not None else self.pwm_frequency
-            if active_frequency <= 0: active_frequency = 50 # Ensure valid frequency
-            
-            self.pwm_instance = GPIO.PWM(self.led_pin, active_frequency)
-            self.pwm_instance.start(max(0, min(100, duty_cycle_percent))) # Clamp duty cycle 0-100
-            self._led_state = True # Consider PWM as LED being active
-            # print(f"[HAL_DEBUG] PWM started at {active_frequency}Hz, {duty_cycle_percent}% duty cycle.")
-
-        def stop_led_pwm(self):
-            if not self.led_pin:
-                return
-            self._stop_pwm_if_active()
-            GPIO.output(self.led_pin, GPIO.LOW) # Ensure LED is off after stopping PWM
-            self._led_state = False
-
-        def change_led_pwm_duty_cycle(self, duty_cycle_percent):
-            if self.pwm_instance and self.led_pin:
-                self.pwm_instance.ChangeDutyCycle(max(0, min(100, duty_cycle_percent))) # Clamp
-                # print(f"[HAL_DEBUG] PWM duty cycle changed to {duty_cycle_percent}%.")
-            elif self.led_pin: # If PWM not active, but trying to change, maybe start it?
-                # For now, only change if already started. Or one could start it here.
-                # print("[HAL_DEBUG] PWM not active, cannot change duty cycle. Call start_led_pwm first.")
-                pass 
-
-        def get_event(self):
-            current_time = time.monotonic()
-            event = BUTTON_NO_EVENT
-
-            # --- Debouncing Logic ---
-            raw_state = GPIO.input(self.button_pin)
-            if raw_state != self._physical_button_state:
-                # Physical state changed, reset debounce timer
-                self._physical_button_state = raw_state
-                self._last_state_change_time = current_time
-                # print(f"[HAL_DEBUG] Button raw state: {'RELEASED' if raw_state == GPIO.HIGH else 'PRESSED'}")
-
-            # If debounce time has passed since last raw change, confirm the state
-            if (current_time - self._last_state_change_time) > self.debounce_time:
-                if self._debounced_button_state != self._physical_button_state:
-                    # print(f"[HAL_DEBUG] Button debounced state changed: {'RELEASED' if self._physical_button_state == GPIO.HIGH else 'PRESSED'}")
-                    self._debounced_button_state = self._physical_button_state
-                    # This is where we act on a confirmed press or release
-                    
-                    # --- Event State Machine based on debounced state changes ---
-                    if self._debounced_button_state == GPIO.LOW: # Button Pressed
-                        if self._button_event_state == "IDLE":
-                            self._button_event_state = "PRESSED"
-                            self._first_press_time = current_time
-                            # print(f"[HAL_DEBUG] Event state: IDLE -> PRESSED at {self._first_press_time}")
-                        elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
-                            # This is the second press for a double tap
-                            if (current_time - self._first_press_time) < self.double_tap_window:
-                                print("[HAL] RealButton: Double tap detected.")
-                                event = BUTTON_DOUBLE_TAP
-                                self._button_event_state = "IDLE" # Reset state
-                            else:
-                                # Too late for a double tap, treat as a new single press sequence
-                                # print("[HAL_DEBUG] Second press too late for double tap, new press sequence.")
-                                self._button_event_state = "PRESSED"
-                                self._first_press_time = current_time 
-                    
-                    else: # Button Released (self._debounced_button_state == GPIO.HIGH)
-                        if self._button_event_state == "PRESSED":
-                            # Released after a press. Could be tap or start of double tap window.
-                            # Check if it was a long press first (before release was detected)
-                            # Note: Long press is typically checked while button is still held.
-                            # This release signifies the end of a press that wasn't long enough to be a long press yet.
-                            self._button_event_state = "WAITING_FOR_SECOND_TAP"
-                            self._first_release_time = current_time
-                            # print(f"[HAL_DEBUG] Event state: PRESSED -> WAITING_FOR_SECOND_TAP at {self._first_release_time}")
-                        # If it was WAITING_FOR_SECOND_TAP and released, it means nothing (already released)
-                        # If it was IDLE and released, it means nothing (already released)
-
-            # --- Timeout and Long Press Logic (checked every call, regardless of debounced state change) ---
-            if self._button_event_state == "PRESSED":
-                if (current_time - self._first_press_time) > self.long_press_duration:
-                    # print(f"[HAL_DEBUG] Checking for long press: current_time={current_time}, first_press_time={self._first_press_time}, diff={(current_time - self._first_press_time)}")
-                    if self._debounced_button_state == GPIO.LOW: # Still pressed
-                        print("[HAL] RealButton: Long press detected.")
-                        event = BUTTON_LONG_PRESS
-                        self._button_event_state = "IDLE" # Reset state after long press
-            
-            elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
-                # If window for double tap expires, it was a single tap
-                if (current_time - self._first_press_time) > self.double_tap_window: 
-                    # Ensure it's based on time from first press to allow for second press to occur and be processed
-                    # More accurately, time from first release might be (current_time - self._first_release_time)
-                    if (current_time - self._first_release_time) > self.double_tap_window: # Check from release time
-                        print("[HAL] RealButton: Tap detected (double tap window expired).")
-                        event = BUTTON_TAP
-                        self._button_event_state = "IDLE" # Reset state
-
-            return event
-
-        def set_led(self, state):
-            if self.led_pin:
-                self._stop_pwm_if_active()
-                new_gpio_state = GPIO.HIGH if state else GPIO.LOW
-                GPIO.output(self.led_pin, new_gpio_state)
-                self._led_state = bool(state)
-                # print(f"[HAL] RealButton: LED set to {'ON' if self._led_state else 'OFF'}")
-
-        def start_led_pwm(self, duty_cycle_percent, frequency=None):
-            if not self.led_pin:
-                return
-            self._stop_pwm_if_active() # Stop any existing PWM or solid state
-            
-            active_frequency = frequency if frequency is not None else self.pwm_frequency
-            if active_frequency <= 0: active_frequency = 50 # Ensure valid frequency
-            
-            self.pwm_instance = GPIO.PWM(self.led_pin, active_frequency)
-            self.pwm_instance.start(max(0, min(100, duty_cycle_percent))) # Clamp duty cycle 0-100
-            self._led_state = True # Consider PWM as LED being active
-            # print(f"[HAL_DEBUG] PWM started at {active_frequency}Hz, {duty_cycle_percent}% duty cycle.")
-
-        def stop_led_pwm(self):
-            if not self.led_pin:
-                return
-            self._stop_pwm_if_active()
-            GPIO.output(self.led_pin, GPIO.LOW) # Ensure LED is off after stopping PWM
-            self._led_state = False
-
-        def change_led_pwm_duty_cycle(self, duty_cycle_percent):
-            if self.pwm_instance and self.led_pin:
-                self.pwm_instance.ChangeDutyCycle(max(0, min(100, duty_cycle_percent))) # Clamp
-                # print(f"[HAL_DEBUG] PWM duty cycle changed to {duty_cycle_percent}%.")
-            elif self.led_pin: # If PWM not active, but trying to change, maybe start it?
-                # For now, only change if already started. Or one could start it here.
-                # print("[HAL_DEBUG] PWM not active, cannot change duty cycle. Call start_led_pwm first.")
-                pass 
-
-        def get_event(self):
-            current_time = time.monotonic()
-            event = BUTTON_NO_EVENT
-
-            # --- Debouncing Logic ---
-            raw_state = GPIO.input(self.button_pin)
-            if raw_state != self._physical_button_state:
-                # Physical state changed, reset debounce timer
-                self._physical_button_state = raw_state
-                self._last_state_change_time = current_time
-                # print(f"[HAL_DEBUG] Button raw state: {'RELEASED' if raw_state == GPIO.HIGH else 'PRESSED'}")
-
-            # If debounce time has passed since last raw change, confirm the state
-            if (current_time - self._last_state_change_time) > self.debounce_time:
-                if self._debounced_button_state != self._physical_button_state:
-                    # print(f"[HAL_DEBUG] Button debounced state changed: {'RELEASED' if self._physical_button_state == GPIO.HIGH else 'PRESSED'}")
-                    self._debounced_button_state = self._physical_button_state
-                    # This is where we act on a confirmed press or release
-                    
-                    # --- Event State Machine based on debounced state changes ---
-                    if self._debounced_button_state == GPIO.LOW: # Button Pressed
-                        if self._button_event_state == "IDLE":
-                            self._button_event_state = "PRESSED"
-                            self._first_press_time = current_time
-                            # print(f"[HAL_DEBUG] Event state: IDLE -> PRESSED at {self._first_press_time}")
-                        elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
-                            # This is the second press for a double tap
-                            if (current_time - self._first_press_time) < self.double_tap_window:
-                                print("[HAL] RealButton: Double tap detected.")
-                                event = BUTTON_DOUBLE_TAP
-                                self._button_event_state = "IDLE" # Reset state
-                            else:
-                                # Too late for a double tap, treat as a new single press sequence
-                                # print("[HAL_DEBUG] Second press too late for double tap, new press sequence.")
-                                self._button_event_state = "PRESSED"
-                                self._first_press_time = current_time 
-                    
-                    else: # Button Released (self._debounced_button_state == GPIO.HIGH)
-                        if self._button_event_state == "PRESSED":
-                            # Released after a press. Could be tap or start of double tap window.
-                            # Check if it was a long press first (before release was detected)
-                            # Note: Long press is typically checked while button is still held.
-                            # This release signifies the end of a press that wasn't long enough to be a long press yet.
-                            self._button_event_state = "WAITING_FOR_SECOND_TAP"
-                            self._first_release_time = current_time
-                            # print(f"[HAL_DEBUG] Event state: PRESSED -> WAITING_FOR_SECOND_TAP at {self._first_release_time}")
-                        # If it was WAITING_FOR_SECOND_TAP and released, it means nothing (already released)
-                        # If it was IDLE and released, it means nothing (already released)
-
-            # --- Timeout and Long Press Logic (checked every call, regardless of debounced state change) ---
-            if self._button_event_state == "PRESSED":
-                if (current_time - self._first_press_time) > self.long_press_duration:
-                    # print(f"[HAL_DEBUG] Checking for long press: current_time={current_time}, first_press_time={self._first_press_time}, diff={(current_time - self._first_press_time)}")
-                    if self._debounced_button_state == GPIO.LOW: # Still pressed
-                        print("[HAL] RealButton: Long press detected.")
-                        event = BUTTON_LONG_PRESS
-                        self._button_event_state = "IDLE" # Reset state after long press
-            
-            elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
-                # If window for double tap expires, it was a single tap
-                if (current_time - self._first_press_time) > self.double_tap_window: 
-                    # Ensure it's based on time from first press to allow for second press to occur and be processed
-                    # More accurately, time from first release might be (current_time - self._first_release_time)
-                    if (current_time - self._first_release_time) > self.double_tap_window: # Check from release time
-                        print("[HAL] RealButton: Tap detected (double tap window expired).")
-                        event = BUTTON_TAP
-                        self._button_event_state = "IDLE" # Reset state
-
-            return event
-
-        def set_led(self, state):
+        def set_led(self, state: bool) -> None:
             if self.led_pin:
                 self._stop_pwm_if_active()
                 new_gpio_state = GPIO.HIGH if state else GPIO.LOW
@@ -523,7 +561,7 @@ if IS_RASPBERRY_PI:
                 self._led_state = bool(state)
                 # print(f"[HAL] RealButton: LED set to {'ON' if self._led_state else 'OFF'}")
 
-        def start_led_pwm(self, duty_cycle_percent, frequency=None):
+        def start_led_pwm(self, duty_cycle_percent: float, frequency: int | None = None) -> None:
             if not self.led_pin:
                 return
             self._stop_pwm_if_active() # Stop any existing PWM or solid state
@@ -536,14 +574,14 @@ if IS_RASPBERRY_PI:
             self._led_state = True # Consider PWM as LED being active
             # print(f"[HAL_DEBUG] PWM started at {active_frequency}Hz, {duty_cycle_percent}% duty cycle.")
 
-        def stop_led_pwm(self):
+        def stop_led_pwm(self) -> None:
             if not self.led_pin:
                 return
             self._stop_pwm_if_active()
             GPIO.output(self.led_pin, GPIO.LOW) # Ensure LED is off after stopping PWM
             self._led_state = False
 
-        def change_led_pwm_duty_cycle(self, duty_cycle_percent):
+        def change_led_pwm_duty_cycle(self, duty_cycle_percent: float) -> None:
             if self.pwm_instance and self.led_pin:
                 self.pwm_instance.ChangeDutyCycle(max(0, min(100, duty_cycle_percent))) # Clamp
                 # print(f"[HAL_DEBUG] PWM duty cycle changed to {duty_cycle_percent}%.")
@@ -552,12 +590,12 @@ if IS_RASPBERRY_PI:
                 # print("[HAL_DEBUG] PWM not active, cannot change duty cycle. Call start_led_pwm first.")
                 pass 
 
-        def get_event(self):
+        def get_event(self) -> int:
             current_time = time.monotonic()
             event = BUTTON_NO_EVENT
 
             # --- Debouncing Logic ---
-            raw_state = GPIO.input(self.button_pin)
+            raw_state = self._read_raw_state()
             if raw_state != self._physical_button_state:
                 # Physical state changed, reset debounce timer
                 self._physical_button_state = raw_state
@@ -580,7 +618,7 @@ if IS_RASPBERRY_PI:
                         elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
                             # This is the second press for a double tap
                             if (current_time - self._first_press_time) < self.double_tap_window:
-                                print("[HAL] RealButton: Double tap detected.")
+                                logger.debug("[HAL] RealButton: Double tap detected.")
                                 event = BUTTON_DOUBLE_TAP
                                 self._button_event_state = "IDLE" # Reset state
                             else:
@@ -606,7 +644,7 @@ if IS_RASPBERRY_PI:
                 if (current_time - self._first_press_time) > self.long_press_duration:
                     # print(f"[HAL_DEBUG] Checking for long press: current_time={current_time}, first_press_time={self._first_press_time}, diff={(current_time - self._first_press_time)}")
                     if self._debounced_button_state == GPIO.LOW: # Still pressed
-                        print("[HAL] RealButton: Long press detected.")
+                        logger.debug("[HAL] RealButton: Long press detected.")
                         event = BUTTON_LONG_PRESS
                         self._button_event_state = "IDLE" # Reset state after long press
             
@@ -616,264 +654,103 @@ if IS_RASPBERRY_PI:
                     # Ensure it's based on time from first press to allow for second press to occur and be processed
                     # More accurately, time from first release might be (current_time - self._first_release_time)
                     if (current_time - self._first_release_time) > self.double_tap_window: # Check from release time
-                        print("[HAL] RealButton: Tap detected (double tap window expired).")
+                        logger.debug("[HAL] RealButton: Tap detected (double tap window expired).")
                         event = BUTTON_TAP
                         self._button_event_state = "IDLE" # Reset state
 
             return event
 
-        def set_led(self, state):
-            if self.led_pin:
-                self._stop_pwm_if_active()
-                new_gpio_state = GPIO.HIGH if state else GPIO.LOW
-                GPIO.output(self.led_pin, new_gpio_state)
-                self._led_state = bool(state)
-                # print(f"[HAL] RealButton: LED set to {'ON' if self._led_state else 'OFF'}")
-
-        def start_led_pwm(self, duty_cycle_percent, frequency=None):
-            if not self.led_pin:
+        def _read_input_events(self) -> None:
+            """Forward key press/release from the input device to get_event(); runs on its own thread."""
+            try:
+                for ev in self._input_device.read_loop():
+                    if ev.type == evdev.ecodes.EV_KEY and ev.value in (0, 1): # Ignore autorepeat (2)
+                        self._key_events.put(GPIO.LOW if ev.value == 1 else GPIO.HIGH)
+                        if self._wake_event is not None:
+                            self._wake_event.set()
+            except OSError as e:
+                logger.error(f"[HAL_ERROR] RealButton input device read failed: {e}")
+
+        def _read_raw_state(self) -> int:
+            """Raw button level (GPIO.LOW when pressed)."""
+            if self._input_device is None:
+                return GPIO.input(self.button_pin)
+            try:
+                # One transition per call so a quick press/release still reaches the state machine
+                self._key_level = self._key_events.get_nowait()
+            except queue.Empty:
+                pass
+            return self._key_level
+
+        def attach_wakeup(self, wake_event: threading.Event) -> None:
+            """Wake the main loop on any edge of the button pin."""
+            if self._input_device is not None:
+                self._wake_event = wake_event
                 return
-            self._stop_pwm_if_active() # Stop any existing PWM or solid state
-            
-            active_frequency = frequency if frequency is not None else self.pwm_frequency
-            if active_frequency <= 0: active_frequency = 50 # Ensure valid frequency
-            
-            self.pwm_instance = GPIO.PWM(self.led_pin, active_frequency)
-            self.pwm_instance.start(max(0, min(100, duty_cycle_percent))) # Clamp duty cycle 0-100
-            self._led_state = True # Consider PWM as LED being active
-            # print(f"[HAL_DEBUG] PWM started at {active_frequency}Hz, {duty_cycle_percent}% duty cycle.")
-
-        def stop_led_pwm(self):
-            if not self.led_pin:
-                return
-            self._stop_pwm_if_active()
-            GPIO.output(self.led_pin, GPIO.LOW) # Ensure LED is off after stopping PWM
-            self._led_state = False
-
-        def change_led_pwm_duty_cycle(self, duty_cycle_percent):
-            if self.pwm_instance and self.led_pin:
-                self.pwm_instance.ChangeDutyCycle(max(0, min(100, duty_cycle_percent))) # Clamp
-                # print(f"[HAL_DEBUG] PWM duty cycle changed to {duty_cycle_percent}%.")
-            elif self.led_pin: # If PWM not active, but trying to change, maybe start it?
-                # For now, only change if already started. Or one could start it here.
-                # print("[HAL_DEBUG] PWM not active, cannot change duty cycle. Call start_led_pwm first.")
-                pass 
-
-        def get_event(self):
-            current_time = time.monotonic()
-            event = BUTTON_NO_EVENT
-
-            # --- Debouncing Logic ---
-            raw_state = GPIO.input(self.button_pin)
-            if raw_state != self._physical_button_state:
-                # Physical state changed, reset debounce timer
-                self._physical_button_state = raw_state
-                self._last_state_change_time = current_time
-                # print(f"[HAL_DEBUG] Button raw state: {'RELEASED' if raw_state == GPIO.HIGH else 'PRESSED'}")
-
-            # If debounce time has passed since last raw change, confirm the state
-            if (current_time - self._last_state_change_time) > self.debounce_time:
-                if self._debounced_button_state != self._physical_button_state:
-                    # print(f"[HAL_DEBUG] Button debounced state changed: {'RELEASED' if self._physical_button_state == GPIO.HIGH else 'PRESSED'}")
-                    self._debounced_button_state = self._physical_button_state
-                    # This is where we act on a confirmed press or release
-                    
-                    # --- Event State Machine based on debounced state changes ---
-                    if self._debounced_button_state == GPIO.LOW: # Button Pressed
-                        if self._button_event_state == "IDLE":
-                            self._button_event_state = "PRESSED"
-                            self._first_press_time = current_time
-                            # print(f"[HAL_DEBUG] Event state: IDLE -> PRESSED at {self._first_press_time}")
-                        elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
-                            # This is the second press for a double tap
-                            if (current_time - self._first_press_time) < self.double_tap_window:
-                                print("[HAL] RealButton: Double tap detected.")
-                                event = BUTTON_DOUBLE_TAP
-                                self._button_event_state = "IDLE" # Reset state
-                            else:
-                                # Too late for a double tap, treat as a new single press sequence
-                                # print("[HAL_DEBUG] Second press too late for double tap, new press sequence.")
-                                self._button_event_state = "PRESSED"
-                                self._first_press_time = current_time 
-                    
-                    else: # Button Released (self._debounced_button_state == GPIO.HIGH)
-                        if self._button_event_state == "PRESSED":
-                            # Released after a press. Could be tap or start of double tap window.
-                            # Check if it was a long press first (before release was detected)
-                            # Note: Long press is typically checked while button is still held.
-                            # This release signifies the end of a press that wasn't long enough to be a long press yet.
-                            self._button_event_state = "WAITING_FOR_SECOND_TAP"
-                            self._first_release_time = current_time
-                            # print(f"[HAL_DEBUG] Event state: PRESSED -> WAITING_FOR_SECOND_TAP at {self._first_release_time}")
-                        # If it was WAITING_FOR_SECOND_TAP and released, it means nothing (already released)
-                        # If it was IDLE and released, it means nothing (already released)
-
-            # --- Timeout and Long Press Logic (checked every call, regardless of debounced state change) ---
-            if self._button_event_state == "PRESSED":
-                if (current_time - self._first_press_time) > self.long_press_duration:
-                    # print(f"[HAL_DEBUG] Checking for long press: current_time={current_time}, first_press_time={self._first_press_time}, diff={(current_time - self._first_press_time)}")
-                    if self._debounced_button_state == GPIO.LOW: # Still pressed
-                        print("[HAL] RealButton: Long press detected.")
-                        event = BUTTON_LONG_PRESS
-                        self._button_event_state = "IDLE" # Reset state after long press
-            
-            elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
-                # If window for double tap expires, it was a single tap
-                if (current_time - self._first_press_time) > self.double_tap_window: 
-                    # Ensure it's based on time from first press to allow for second press to occur and be processed
-                    # More accurately, time from first release might be (current_time - self._first_release_time)
-                    if (current_time - self._first_release_time) > self.double_tap_window: # Check from release time
-                        print("[HAL] RealButton: Tap detected (double tap window expired).")
-                        event = BUTTON_TAP
-                        self._button_event_state = "IDLE" # Reset state
+            GPIO.add_event_detect(self.button_pin, GPIO.BOTH, callback=lambda _channel: wake_event.set())
+            logger.info(f"[HAL] RealButton: edge wakeup enabled on GPIO {self.button_pin}")
 
-            return event
+        def needs_polling(self) -> bool:
+            """True while a debounce or tap/double-tap/long-press sequence is still being resolved."""
+            return (self._button_event_state != "IDLE"
+                    or self._debounced_button_state != self._physical_button_state
+                    or not self._key_events.empty())
 
-        def set_led(self, state):
-            if self.led_pin:
-                self._stop_pwm_if_active()
-                new_gpio_state = GPIO.HIGH if state else GPIO.LOW
-                GPIO.output(self.led_pin, new_gpio_state)
-                self._led_state = bool(state)
-                # print(f"[HAL] RealButton: LED set to {'ON' if self._led_state else 'OFF'}")
-
-        def start_led_pwm(self, duty_cycle_percent, frequency=None):
-            if not self.led_pin:
-                return
-            self._stop_pwm_if_active() # Stop any existing PWM or solid state
-            
-            active_frequency = frequency if frequency is not None else self.pwm_frequency
-            if active_frequency <= 0: active_frequency = 50 # Ensure valid frequency
-            
-            self.pwm_instance = GPIO.PWM(self.led_pin, active_frequency)
-            self.pwm_instance.start(max(0, min(100, duty_cycle_percent))) # Clamp duty cycle 0-100
-            self._led_state = True # Consider PWM as LED being active
-            # print(f"[HAL_DEBUG] PWM started at {active_frequency}Hz, {duty_cycle_percent}% duty cycle.")
-
-        def stop_led_pwm(self):
-            if not self.led_pin:
-                return
-            self._stop_pwm_if_active()
-            GPIO.output(self.led_pin, GPIO.LOW) # Ensure LED is off after stopping PWM
-            self._led_state = False
-
-        def change_led_pwm_duty_cycle(self, duty_cycle_percent):
-            if self.pwm_instance and self.led_pin:
-                self.pwm_instance.ChangeDutyCycle(max(0, min(100, duty_cycle_percent))) # Clamp
-                # print(f"[HAL_DEBUG] PWM duty cycle changed to {duty_cycle_percent}%.")
-            elif self.led_pin: # If PWM not active, but trying to change, maybe start it?
-                # For now, only change if already started. Or one could start it here.
-                # print("[HAL_DEBUG] PWM not active, cannot change duty cycle. Call start_led_pwm first.")
-                pass 
-
-        def get_event(self):
-            current_time = time.monotonic()
-            event = BUTTON_NO_EVENT
-
-            # --- Debouncing Logic ---
-            raw_state = GPIO.input(self.button_pin)
-            if raw_state != self._physical_button_state:
-                # Physical state changed, reset debounce timer
-                self._physical_button_state = raw_state
-                self._last_state_change_time = current_time
-                # print(f"[HAL_DEBUG] Button raw state: {'RELEASED' if raw_state == GPIO.HIGH else 'PRESSED'}")
-
-            # If debounce time has passed since last raw change, confirm the state
-            if (current_time - self._last_state_change_time) > self.debounce_time:
-                if self._debounced_button_state != self._physical_button_state:
-                    # print(f"[HAL_DEBUG] Button debounced state changed: {'RELEASED' if self._physical_button_state == GPIO.HIGH else 'PRESSED'}")
-                    self._debounced_button_state = self._physical_button_state
-                    # This is where we act on a confirmed press or release
-                    
-                    # --- Event State Machine based on debounced state changes ---
-                    if self._debounced_button_state == GPIO.LOW: # Button Pressed
-                        if self._button_event_state == "IDLE":
-                            self._button_event_state = "PRESSED"
-                            self._first_press_time = current_time
-                            # print(f"[HAL_DEBUG] Event state: IDLE -> PRESSED at {self._first_press_time}")
-                        elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
-                            # This is the second press for a double tap
-                            if (current_time - self._first_press_time) < self.double_tap_window:
-                                print("[HAL] RealButton: Double tap detected.")
-                                event = BUTTON_DOUBLE_TAP
-                                self._button_event_state = "IDLE" # Reset state
-                            else:
-                                # Too late for a double tap, treat as a new single press sequence
-                                # print("[HAL_DEBUG] Second press too late for double tap, new press sequence.")
-                                self._button_event_state = "PRESSED"
-                                self._first_press_time = current_time 
-                    
-                    else: # Button Released (self._debounced_button_state == GPIO.HIGH)
-                        if self._button_event_state == "PRESSED":
-                            # Released after a press. Could be tap or start of double tap window.
-                            # Check if it was a long press first (before release was detected)
-                            # Note: Long press is typically checked while button is still held.
-                            # This release signifies the end of a press that wasn't long enough to be a long press yet.
-                            self._button_event_state = "WAITING_FOR_SECOND_TAP"
-                            self._first_release_time = current_time
-                            # print(f"[HAL_DEBUG] Event state: PRESSED -> WAITING_FOR_SECOND_TAP at {self._first_release_time}")
-                        # If it was WAITING_FOR_SECOND_TAP and released, it means nothing (already released)
-                        # If it was IDLE and released, it means nothing (already released)
-
-            # --- Timeout and Long Press Logic (checked every call, regardless of debounced state change) ---
-            if self._button_event_state == "PRESSED":
-                if (current_time - self._first_press_time) > self.long_press_duration:
-                    # print(f"[HAL_DEBUG] Checking for long press: current_time={current_time}, first_press_time={self._first_press_time}, diff={(current_time - self._first_press_time)}")
-                    if self._debounced_button_state == GPIO.LOW: # Still pressed
-                        print("[HAL] RealButton: Long press detected.")
-                        event = BUTTON_LONG_PRESS
-                        self._button_event_state = "IDLE" # Reset state after long press
-            
-            elif self._button_event_state == "WAITING_FOR_SECOND_TAP":
-                # If window for double tap expires, it was a single tap
-                if (current_time - self._first_press_time) > self.double_tap_window: 
-                    # Ensure it's based on time from first press to allow for second press to occur and be processed
-                    # More accurately, time from first release might be (current_time - self._first_release_time)
-                    if (current_time - self._first_release_time) > self.double_tap_window: # Check from release time
-                        print("[HAL] RealButton: Tap detected (double tap window expired).")
-                        event = BUTTON_TAP
-                        self._button_event_state = "IDLE" # Reset state
-
-            return event
-
-        def cleanup(self):
+        def cleanup(self) -> None:
             self._stop_pwm_if_active()
+            if self._input_device is not None:
+                try:
+                    self._input_device.ungrab()
+                except OSError:
+                    pass
             if self.led_pin:
                 GPIO.output(self.led_pin, GPIO.LOW)
             # GPIO.cleanup([self.button_pin, self.led_pin]) # Clean up specific pins
-            print(f"[HAL] RealButton cleanup for pins: {self.button_pin}, {self.led_pin}")
+            logger.info(f"[HAL] RealButton cleanup for pins: {self.button_pin}, {self.led_pin}")
             pass # GPIO.cleanup() should be called once globally if at all for long running scripts
 
     class RealVolumeControl:
         """
-        Real volume control using MCP3008 ADC (skeleton, to be implemented for actual hardware).
+        Real volume control using an MCP3008 ADC read directly over hardware SPI (spidev).
+        Readings are smoothed with a one-pole IIR filter so pot noise doesn't
+        trigger volume changes.
         """
+        SMOOTHING = 0.2 # Weight of each new sample in the IIR filter
+
         def __init__(self, adc_channel=0, spi_port=0, spi_cs=0, spi_clk=None, spi_miso=None, spi_mosi=None):
-            # For MCP3008, you'd typically use a library like Adafruit_MCP3008
-            # Example:
-            # SPI_PORT   = spi_port
-            # SPI_DEVICE = spi_cs # This usually means CS0 or CS1, not a GPIO number directly for hardware SPI
-            # if spi_clk and spi_miso and spi_mosi: # Software SPI
-            #    self.mcp = Adafruit_MCP3008.MCP3008(clk=spi_clk, cs=spi_cs, miso=spi_miso, mosi=spi_mosi)
-            # else: # Hardware SPI
-            #    self.mcp = Adafruit_MCP3008.MCP3008(spi=SPI.SpiDev(SPI_PORT, SPI_DEVICE))
             self.adc_channel = adc_channel
-            # print(f"[HAL] Initialized RealVolumeControl (ADC Channel: {self.adc_channel})")
-            print(f"[HAL] RealVolumeControl initialized (NOT IMPLEMENTED) ADC Channel: {self.adc_channel}, SPI{spi_port}-CS{spi_cs}")
-
+            self._smoothed = None
+            self._reported = None
+            self._spi = None
+            if spidev is None:
+                logger.error("[HAL_ERROR] spidev not installed, RealVolumeControl will report a fixed volume")
+                return
+            self._spi = spidev.SpiDev()
+            self._spi.open(spi_port, spi_cs)
+            self._spi.max_speed_hz = 1_350_000 # MCP3008 maximum at 3.3V
+            logger.info(f"[HAL] Initialized RealVolumeControl (ADC Channel: {self.adc_channel}, SPI{spi_port}-CS{spi_cs})")
 
         def get_volume(self):
-            # value = self.mcp.read_adc(self.adc_channel) # Value from 0 to 1023
-            # # Normalize to 0.0 - 1.0
-            # normalized_volume = value / 1023.0
-            # print(f"[HAL] RealVolumeControl: Raw ADC {value}, Volume {normalized_volume:.2f}")
-            # return normalized_volume
-            print("[HAL] RealVolumeControl: get_volume() called (NOT IMPLEMENTED)")
-            return 0.75 # Placeholder
+            if self._spi is None:
+                return 0.75 # Placeholder
+            # Single-ended read: start bit, SGL/DIFF=1 + channel, then clock out 10 bits
+            reply = self._spi.xfer2([0x01, 0x80 | (self.adc_channel << 4), 0x00])
+            raw = (((reply[1] & 0x03) << 8) | reply[2]) / 1023.0
+            if self._smoothed is None:
+                self._smoothed = raw
+            else:
+                self._smoothed += self.SMOOTHING * (raw - self._smoothed)
+            return self._smoothed
+
+        def get_volume_if_changed(self, threshold):
+            """Smoothed knob level, or None if it hasn't moved more than threshold since last reported"""
+            return _volume_if_changed(self, threshold)
 
         def cleanup(self):
-            print("[HAL] RealVolumeControl cleanup.")
-            pass
+            if self._spi is not None:
+                self._spi.close()
+                self._spi = None
+            logger.info("[HAL] RealVolumeControl cleanup.")
 
 else: # Not on Raspberry Pi, ensure Real classes are not used if IS_RASPBERRY_PI is False
     class RealUIDReader: # Define as placeholder if not on Pi
@@ -891,6 +768,7 @@ else: # Not on Raspberry Pi, ensure Real classes are not used if IS_RASPBERRY_PI
     class RealVolumeControl: # Define as placeholder
         def __init__(self, *args, **kwargs): raise NotImplementedError("RealVolumeControl only available on Raspberry Pi")
         def get_volume(self): raise NotImplementedError()
+        def get_volume_if_changed(self, threshold): raise NotImplementedError()
         def cleanup(self): raise NotImplementedError()
 
 # Export UIDReader, Button, and VolumeControl as the correct class for the environment
@@ -3,78 +3,140 @@ Audio utilities for the Storyteller Box.
 Handles audio engine initialization, volume control, preloading, and playback orchestration.
 """
 
+import math
+import os
 import pygame
+import threading
 import time
-import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from ctypes import c_double
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set
 import json
 import logging
 
 from config.app_config import (
     AUDIO_FREQUENCY, AUDIO_BUFFER, AUDIO_CHANNELS, MAX_AUDIO_CHANNELS,
-    MIN_SOFTWARE_VOLUME, MAX_SOFTWARE_VOLUME, BGM_FOLDER, AUDIO_FOLDER, STORIES_FOLDER
+    MIN_SOFTWARE_VOLUME, MAX_SOFTWARE_VOLUME, AUDIO_FOLDER, STORIES_FOLDER,
+    NARRATION_CHANNEL_ID, FEEDBACK_CHANNEL_ID, BGM_CHANNEL_ID, NARRATION_CACHE_MAX_BYTES, AVAILABLE_TONES
 )
 from utils.bgm_utils import (
-    fade_bgm_to, stop_bgm,
-    BGM_INTRO_VOLUME, BGM_NARRATION_VOLUME, BGM_OUTRO_VOLUME
+    BGM_PATHS, BGM_INTRO_VOLUME, BGM_NARRATION_VOLUME
 )
+from utils.data_utils import audio_file_exists
 from utils.log_utils import logger
+from utils.sched_utils import drop_inherited_priority
+
+# Posted by SDL when the story BGM (music stream or BGM channel) ends, replacing get_busy() polling
+MUSIC_END_EVENT = pygame.USEREVENT + 1
+# Posted when the feedback channel finishes (or is cut off); USEREVENT + 2 is box.py's hardware wake-up
+FEEDBACK_END_EVENT = pygame.USEREVENT + 3
+# Posted when the narration channel finishes (or is cut off); box.py's timers use USEREVENT + 4 and + 5
+NARRATION_END_EVENT = pygame.USEREVENT + 6
 
 # Audio cache to reduce loading times
 BGM_CACHE: Dict[str, pygame.mixer.Sound] = {}
-NARRATION_CACHE: Dict[str, pygame.mixer.Sound] = {}
+# Decoded feedback sounds keyed by file name, so a tap doesn't decode an mp3 on the main thread
+_SOUND_CACHE: Dict[str, pygame.mixer.Sound] = {}
+FEEDBACK_SOUNDS = ("error.mp3", "boot.mp3", "card_valid.mp3", "card_invalid.mp3", "transition.mp3",
+                   "shutdown.mp3", "pause.mp3", "resume.mp3", "success.mp3")
+# Narration Sounds keyed by str(path), least recently used first
+NARRATION_CACHE: "OrderedDict[str, pygame.mixer.Sound]" = OrderedDict()
+_narration_cache_bytes = 0
+_narration_cache_lock = threading.Lock()
+# Audio paths already found missing, so retrying them doesn't stat() the SD card again
+_MISSING_AUDIO: Set[str] = set()
+
+# Set once initialize_audio_engine() has opened the mixer
+_audio_ready = False
 
-# Master volume level for the system
-master_volume_level: float = MAX_SOFTWARE_VOLUME
-master_volume_level = MAX_SOFTWARE_VOLUME
-BGM_CACHE = {}
-NARRATION_CACHE = {}
+# Where the current story's BGM plays: the BGM Channel for a cached loop, else the music stream.
+# Both expose set_volume/pause/unpause/stop/get_busy, so the story code drives either one.
+_bgm_player = pygame.mixer.music
 
+# Master volume level for the system; a c_double so threads share one value without a global
+MASTER_VOLUME = c_double(MAX_SOFTWARE_VOLUME)
 
-def initialize_audio_engine():
-    """Initialize the audio engine with optimal settings"""
+
+def initialize_audio_engine(buffer=None):
+    """
+    Initialize the audio engine with optimal settings.
+
+    Args:
+        buffer (int, optional): Mixer buffer size in samples. Defaults to AUDIO_BUFFER.
+    """
+    global _audio_ready
+    buffer = buffer or AUDIO_BUFFER
+    _audio_ready = False
     try:
+        # Ask PipeWire for a matching quantum so the small buffer isn't padded server-side
+        os.environ.setdefault("PIPEWIRE_LATENCY", f"{buffer}/{AUDIO_FREQUENCY}")
         pygame.mixer.quit()  # Ensure clean state
+        # pre_init so a later pygame.init() keeps the same settings
+        pygame.mixer.pre_init(frequency=AUDIO_FREQUENCY, size=-16, channels=AUDIO_CHANNELS, buffer=buffer,
+                              allowedchanges=0)
         pygame.mixer.init(
             frequency=AUDIO_FREQUENCY,
             size=-16,  # 16-bit signed
             channels=AUDIO_CHANNELS,
-            buffer=AUDIO_BUFFER
+            buffer=buffer,
+            allowedchanges=0  # Pin the format; SDL converts instead of reopening at the device's rate
         )
         pygame.mixer.set_num_channels(MAX_AUDIO_CHANNELS)
-        logger.info("Audio engine initialized successfully")
+        # Reserve the narration, feedback and BGM channels so Sound.play() can never steal them
+        pygame.mixer.set_reserved(max(NARRATION_CHANNEL_ID, FEEDBACK_CHANNEL_ID, BGM_CHANNEL_ID) + 1)
+        pygame.mixer.music.set_endevent(MUSIC_END_EVENT)
+        pygame.mixer.Channel(BGM_CHANNEL_ID).set_endevent(MUSIC_END_EVENT)
+        pygame.mixer.Channel(FEEDBACK_CHANNEL_ID).set_endevent(FEEDBACK_END_EVENT)
+        pygame.mixer.Channel(NARRATION_CHANNEL_ID).set_endevent(NARRATION_END_EVENT)
+        logger.info(f"Audio engine initialized successfully (buffer: {buffer} samples, "
+                    f"~{buffer * 1000 / AUDIO_FREQUENCY:.1f}ms)")
+        _audio_ready = True
         return True
     except Exception as e:
         logger.error(f"Failed to initialize audio engine: {e}")
-        logger.debug(f"{traceback.format_exc()}")
+        logger.debug("Traceback:", exc_info=True)
         return False
 
 
+def is_audio_ready():
+    """True once the mixer has been initialized."""
+    return _audio_ready
+
+
+def _ensure_audio_ready():
+    """Initialize the mixer with default settings on first use if it isn't open yet."""
+    return _audio_ready or initialize_audio_engine()
+
+
 def set_system_volume(level, current_bgm_volume_factor=1.0):
     """Set master volume for Pygame, respecting software limits."""
-    global master_volume_level
-    
     # Level is 0.0 to 1.0 from volume knob
     # Scale it to our desired min/max software range
     effective_volume = MIN_SOFTWARE_VOLUME + (level * (MAX_SOFTWARE_VOLUME - MIN_SOFTWARE_VOLUME))
     
-    # Apply to BGM (music channel)
-    pygame.mixer.music.set_volume(effective_volume)
-    
     # Store the master volume for use by narration
-    master_volume_level = effective_volume
+    MASTER_VOLUME.value = effective_volume
+    
+    # Apply to BGM (music channel) at the level the story sequence is at, and to the narration
+    if STORY_PLAYBACK.active:
+        current_bgm_volume_factor = STORY_PLAYBACK.bgm_level
+        pygame.mixer.Channel(NARRATION_CHANNEL_ID).set_volume(effective_volume)
+    _bgm_player.set_volume(effective_volume * current_bgm_volume_factor)
     
     logger.info(f"System volume set to {effective_volume:.2f} (raw knob: {level:.2f})")
 
 
 def preload_bgm():
     """Preload background music into memory"""
+    if not _ensure_audio_ready():
+        return
     logger.debug("Starting BGM preload...")
     bgm_loaded = 0
     
-    for tone in ["calmo", "avventuroso", "divertente", "misterioso", "tenero"]:
-        bgm_path = BGM_FOLDER / f"{tone}_loop.mp3"
+    for tone in AVAILABLE_TONES:
+        bgm_path = BGM_PATHS[tone]
         if bgm_path.exists():
             try:
                 BGM_CACHE[tone] = pygame.mixer.Sound(str(bgm_path))
@@ -83,14 +145,243 @@ def preload_bgm():
             except Exception as e:
                 logger.error(f"Failed to preload BGM {tone}: {e}")
     
-    logger.info(f"Preloaded {bgm_loaded}/5 BGM files")
+    logger.info(f"Preloaded {bgm_loaded}/{len(AVAILABLE_TONES)} BGM files")
+
+
+def prewarm_audio_files():
+    """
+    Ask the kernel to read the BGM loops and every card's narration into the page cache.
+    posix_fadvise(WILLNEED) only queues readahead and returns at once, so a tap that lands
+    before preload_bgm()/preload_all_narrations() get to a file still skips the SD card seek.
+    Intended for the background preload thread, after preload_card_data().
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    from utils import data_utils
+    
+    paths = [BGM_PATHS[tone] for tone in AVAILABLE_TONES]
+    for card_data in data_utils.CARD_DATA_CACHE.values():
+        paths.extend(story["audio_path"] for story in card_data.get("stories", []) if story["ok"])
+    
+    warmed = 0
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            warmed += 1
+        except OSError as e:
+            logger.debug("Readahead failed for %s: %s", path, e)
+        finally:
+            os.close(fd)
+    logger.info(f"Queued readahead for {warmed} audio files")
+
+
+def _audio_file_exists(path):
+    """audio_file_exists() that remembers misses in _MISSING_AUDIO"""
+    key = str(path)
+    if key in _MISSING_AUDIO:
+        return False
+    if audio_file_exists(key):
+        return True
+    _MISSING_AUDIO.add(key)
+    return False
+
+
+def _sound_size_bytes(sound):
+    """Estimate the decoded size of a Sound without copying its samples"""
+    return int(sound.get_length() * AUDIO_FREQUENCY) * AUDIO_CHANNELS * 2  # 16-bit samples
+
+
+def _cache_narration(key, sound, evict=True):
+    """
+    Add a narration Sound to the LRU cache, keeping it under NARRATION_CACHE_MAX_BYTES.
+
+    Args:
+        key (str): Narration path as a string
+        sound (pygame.mixer.Sound): Decoded narration
+        evict (bool): Drop least recently used entries to make room. When False the
+            sound is only cached if it fits, so bulk preloads don't churn the cache.
+
+    Returns:
+        bool: True if the sound is now cached
+    """
+    global _narration_cache_bytes
+    size = _sound_size_bytes(sound)
+    if size > NARRATION_CACHE_MAX_BYTES:
+        return False
+    with _narration_cache_lock:
+        if key in NARRATION_CACHE:
+            NARRATION_CACHE.move_to_end(key)
+            return True
+        if not evict and _narration_cache_bytes + size > NARRATION_CACHE_MAX_BYTES:
+            return False
+        while NARRATION_CACHE and _narration_cache_bytes + size > NARRATION_CACHE_MAX_BYTES:
+            old_key, old_sound = NARRATION_CACHE.popitem(last=False)
+            _narration_cache_bytes -= _sound_size_bytes(old_sound)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Evicted narration from cache: %s", Path(old_key).name)
+        NARRATION_CACHE[key] = sound
+        _narration_cache_bytes += size
+    return True
+
+
+def get_narration_sound(narration_path):
+    """
+    Return the narration Sound for a path, loading and caching it on a miss.
+
+    Args:
+        narration_path (Path): Path to narration file
+
+    Returns:
+        pygame.mixer.Sound or None: The narration, or None if it could not be loaded
+    """
+    key = str(narration_path)
+    with _narration_cache_lock:
+        sound = NARRATION_CACHE.get(key)
+        if sound is not None:
+            NARRATION_CACHE.move_to_end(key)
+    if sound is not None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Using cached narration: %s", Path(key).name)
+        return sound
+    if not _audio_file_exists(key):
+        logger.error(f"Narration file not found: {narration_path}")
+        return None
+    try:
+        sound = pygame.mixer.Sound(key)
+    except Exception as e:
+        logger.error(f"Failed to load narration {narration_path}: {e}")
+        return None
+    if _cache_narration(key, sound):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Added narration to cache: %s", Path(key).name)
+    return sound
+
+
+# Decode threads for the preload paths; SDL_mixer decodes with the GIL released, so
+# multi-core boards load several narrations at once (single-core boards stay serial)
+PRELOAD_DECODE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+# Its threads start lazily, possibly from the elevated main loop, so they drop that priority first
+_PRELOAD_DECODE_POOL = ThreadPoolExecutor(max_workers=PRELOAD_DECODE_WORKERS, thread_name_prefix="narration-preload",
+                                          initializer=drop_inherited_priority)
+# Decoded bytes per file byte by file suffix, learned from finished decodes (largest seen), so
+# later decodes can be sized from the file before they start
+_DECODE_RATIOS: Dict[str, float] = {}
+# Predicted decoded size of the preload decodes in flight, counted against NARRATION_CACHE_MAX_BYTES
+_decode_reserved_bytes = 0
+
+
+def _predict_decoded_bytes(path):
+    """Decoded size of a narration predicted from its file size, or None until its format has been seen"""
+    ratio = _DECODE_RATIOS.get(path.suffix.lower())
+    if ratio is None:
+        return None
+    try:
+        return int(os.path.getsize(path) * ratio)
+    except OSError:
+        return None
+
+
+def _learn_decode_ratio(path, sound):
+    """Record the decoded/file size ratio of a finished decode for _predict_decoded_bytes()"""
+    try:
+        ratio = _sound_size_bytes(sound) / max(1, os.path.getsize(path))
+    except OSError:
+        return
+    suffix = path.suffix.lower()
+    if ratio > _DECODE_RATIOS.get(suffix, 0.0):
+        _DECODE_RATIOS[suffix] = ratio
+
+
+def _decode_narration(path):
+    """Decode one narration for the preload paths; None if it can't be loaded"""
+    try:
+        return pygame.mixer.Sound(str(path))
+    except Exception as e:
+        logger.error(f"Failed to preload narration {path}: {e}")
+        return None
+
+
+def _decode_narrations(paths, evict=True):
+    """
+    Decode narration files on the preload pool, starting a decode only while the predicted
+    size of the decodes in flight still fits the narration cache budget.
+
+    Args:
+        paths (list): Narration paths to decode
+        evict (bool): Whether the caller evicts cached narrations to make room (see
+            _cache_narration()). When False only the free part of the budget counts, and
+            files predicted not to fit are skipped without being decoded.
+
+    Yields:
+        tuple: (path, Sound, or None if decoding failed), in the order of paths, minus the
+        skipped files. Stops early if the pool is shut down; closing the generator early
+        cancels the decodes that haven't started.
+    """
+    global _decode_reserved_bytes
+    pending = deque()  # (path, Future, reserved bytes), oldest first
+    queued = iter(paths)
+    path = next(queued, None)
+    try:
+        while path is not None or pending:
+            # Start decodes while workers are free and the budget allows
+            while path is not None and len(pending) < PRELOAD_DECODE_WORKERS:
+                predicted = _predict_decoded_bytes(path)
+                with _narration_cache_lock:
+                    free = NARRATION_CACHE_MAX_BYTES - (0 if evict else _narration_cache_bytes)
+                    if predicted is not None and predicted > free:
+                        logger.debug("Skipping narration preload %s: ~%.1fMB won't fit in the cache",
+                                     path.name, predicted / (1024 * 1024))
+                        path = next(queued, None)
+                        continue
+                    # An unknown size waits for this preload's other decodes, so it overshoots by one decode at most
+                    if pending and (predicted is None or predicted > free - _decode_reserved_bytes):
+                        break
+                    reserved = predicted or 0
+                    _decode_reserved_bytes += reserved
+                try:
+                    future = _PRELOAD_DECODE_POOL.submit(_decode_narration, path)
+                except RuntimeError:  # Pool shut down, the app is exiting
+                    with _narration_cache_lock:
+                        _decode_reserved_bytes -= reserved
+                    return
+                pending.append((path, future, reserved))
+                path = next(queued, None)
+            if not pending:
+                break  # The remaining files were all skipped
+            done_path, future, reserved = pending[0]
+            try:
+                sound = future.result()
+            except CancelledError:
+                return
+            if sound is not None:
+                _learn_decode_ratio(done_path, sound)
+            yield done_path, sound
+            # Released once the caller has had the chance to cache the sound, so the budget stays accurate
+            pending.popleft()
+            with _narration_cache_lock:
+                _decode_reserved_bytes -= reserved
+    finally:
+        with _narration_cache_lock:
+            for _, future, reserved in pending:
+                future.cancel()
+                _decode_reserved_bytes -= reserved
+
+
+def _uncached_story_paths(card_data):
+    """Audio paths of a card's playable stories that aren't in NARRATION_CACHE yet"""
+    return [story["audio_path"] for story in card_data.get("stories", [])
+            if story["ok"] and str(story["audio_path"]) not in NARRATION_CACHE]
 
 
 def preload_narration(uid):
     """Preload narration files for a specific card"""
     from utils.data_utils import load_card_stories
     
-    logger.debug(f"Preloading narration for card {uid}...")
+    logger.debug("Preloading narration for card %s...", uid)
     card_data = load_card_stories(uid)
     if not card_data or not card_data.get("stories"):
         logger.warning(f"No stories found for card {uid}, skipping narration preload")
@@ -99,21 +390,41 @@ def preload_narration(uid):
     stories_loaded = 0
     stories_failed = 0
     
-    for story in card_data["stories"]:
-        narration_path = Path(__file__).parent.parent / story["audio"]
-        if narration_path.exists():
-            try:
-                key = f"{uid}_{story['id']}"
-                NARRATION_CACHE[key] = pygame.mixer.Sound(str(narration_path))
-                stories_loaded += 1
-                logger.info(f"Preloaded narration: {story['title']}")
-            except Exception as e:
-                stories_failed += 1
-                logger.error(f"Failed to preload narration {story['title']}: {e}")
+    for narration_path, sound in _decode_narrations(_uncached_story_paths(card_data)):
+        if sound is None:
+            stories_failed += 1
+            continue
+        _cache_narration(str(narration_path), sound)
+        stories_loaded += 1
+        logger.info(f"Preloaded narration: {narration_path.name}")
     
     logger.info(f"Preloaded {stories_loaded} narrations ({stories_failed} failed)")
 
 
+def preload_all_narrations():
+    """
+    Decode every narration referenced by the card cache until the cache budget is full.
+    Intended for the background preload thread, after preload_card_data().
+    """
+    from utils import data_utils
+    
+    # dict.fromkeys drops narrations shared by several cards and keeps card order
+    paths = list(dict.fromkeys(path for card_data in data_utils.CARD_DATA_CACHE.values()
+                               for path in _uncached_story_paths(card_data)))
+    
+    loaded = failed = 0
+    for audio_path, sound in _decode_narrations(paths, evict=False):
+        if sound is None:
+            failed += 1
+        elif _cache_narration(str(audio_path), sound, evict=False):
+            loaded += 1
+    
+    # Files that don't fit are skipped rather than ending the preload, so smaller ones still get cached
+    logger.info(f"Preloaded {loaded} narration files "
+                f"({_narration_cache_bytes / (1024 * 1024):.1f}MB), "
+                f"{len(paths) - loaded - failed} skipped for lack of cache space, {failed} failed")
+
+
 def preload_narration_async(uid):
     """
     Preload narration files for a specific card asynchronously.
@@ -123,31 +434,25 @@ def preload_narration_async(uid):
         uid (str): Card UID to preload
     """
     try:
-        logger.debug(f"[ASYNC] Preloading narration for card {uid}...")
+        logger.debug("[ASYNC] Preloading narration for card %s...", uid)
         from utils.data_utils import load_card_stories
         
         card_data = load_card_stories(uid)
         if not card_data or not card_data.get("stories"):
-            logger.debug(f"[ASYNC] No stories found for card {uid}, skipping narration preload")
+            logger.debug("[ASYNC] No stories found for card %s, skipping narration preload", uid)
             return
         
         stories_loaded = 0
         stories_failed = 0
         
-        for story in card_data["stories"]:
-            if "audio" in story:
-                audio_path = Path(__file__).parent.parent / story["audio"]
-                if audio_path.exists():
-                    # Only preload if not already in cache
-                    if str(audio_path) not in NARRATION_CACHE:
-                        try:
-                            # Use low-level pygame methods for better control
-                            NARRATION_CACHE[str(audio_path)] = pygame.mixer.Sound(str(audio_path))
-                            stories_loaded += 1
-                            logger.debug(f"[ASYNC] Preloaded narration: {story['title']}")
-                        except Exception as e:
-                            stories_failed += 1
-                            logger.error(f"[ASYNC] Failed to preload narration {audio_path}: {e}")
+        # Only preload what isn't already in cache
+        for audio_path, sound in _decode_narrations(_uncached_story_paths(card_data)):
+            if sound is None:
+                stories_failed += 1
+                continue
+            _cache_narration(str(audio_path), sound)
+            stories_loaded += 1
+            logger.debug("[ASYNC] Preloaded narration: %s", audio_path.name)
         
         if stories_loaded > 0:
             logger.info(f"[ASYNC] Preloaded {stories_loaded} narration files for card {uid} ({stories_failed} failed)")
@@ -156,87 +461,287 @@ def preload_narration_async(uid):
     
     except Exception as e:
         logger.error(f"[ASYNC] Error in async narration preload for {uid}: {e}")
-        logger.debug(traceback.format_exc())
+        logger.debug("Traceback:", exc_info=True)
+
+
+# Story playback steps: (name, duration in seconds, BGM level at the end as a fraction of master volume).
+# The BGM level eases (S-curve) from where the previous step left it; duration None waits for the narration.
+STORY_STEPS = (
+    ("intro", 1.0, BGM_INTRO_VOLUME),
+    ("fade_to_narration", 0.5, BGM_NARRATION_VOLUME),  # S-curve, so it can be shorter than a linear fade
+    ("lead_in", 0.2, BGM_NARRATION_VOLUME),
+    ("narration", None, BGM_NARRATION_VOLUME),
+    ("raise", 1.5, BGM_INTRO_VOLUME * 0.8),
+    ("outro", 2.0, BGM_INTRO_VOLUME * 0.8),
+    ("fade_out", 1.5, 0.0),
+)
+_NARRATION_STEP = next(i for i, step in enumerate(STORY_STEPS) if step[1] is None)
+
+
+class StoryPlayback:
+    """
+    BGM intro, narration and outro as a non-blocking sequence driven by the main loop.
+    start() returns immediately; the loop calls tick() by next_deadline() to advance fades
+    and steps, and narration_ended() on NARRATION_END_EVENT. When the sequence finishes the
+    BGM stream is stopped, which posts MUSIC_END_EVENT.
+    The narration may be a Future still decoding on _DECODE_POOL; the intro plays meanwhile
+    and the narration step waits for it.
+    """
+    FADE_STEP = 0.02  # Seconds between BGM volume updates during a fade
+    DECODE_POLL = 0.05  # Seconds between checks on a narration that is still decoding
+
+    def __init__(self):
+        self._step = None  # Index into STORY_STEPS, None when idle
+        self._step_start = 0.0
+        self._fade_from = 0.0
+        self._next_tick = None
+        self._paused_at = None
+        self._narration = None
+        self.bgm_level = 0.0  # Current BGM level as a fraction of master volume
+
+    @property
+    def active(self):
+        return self._step is not None
+
+    def start(self, narration, now):
+        """Begin the sequence; the BGM must already be loaded, and is started right after"""
+        self._narration = narration
+        self._paused_at = None
+        self.bgm_level = STORY_STEPS[0][2]
+        _bgm_player.set_volume(self.bgm_level * MASTER_VOLUME.value)
+        self._enter(0, now)
+
+    def cancel(self):
+        self._step = None
+        self._next_tick = None
+        self._paused_at = None
+        self._narration = None
+
+    def next_deadline(self):
+        """Monotonic time tick() next needs to run, or None if it's waiting on an event"""
+        return None if self._paused_at is not None else self._next_tick
+
+    def tick(self, now):
+        if self._step is None or self._paused_at is not None:
+            return
+        if self._step == _NARRATION_STEP and isinstance(self._narration, Future):
+            self._start_narration(now)
+        while self._step is not None and self._step != _NARRATION_STEP:
+            _, duration, target = STORY_STEPS[self._step]
+            step_end = self._step_start + duration
+            if now < step_end:
+                # Raised-cosine ease: no abrupt start at the top or stall at the quiet end
+                progress = 0.5 - 0.5 * math.cos(math.pi * (now - self._step_start) / duration)
+                self._set_bgm_level(self._fade_from + (target - self._fade_from) * progress)
+                self._next_tick = min(now + self.FADE_STEP, step_end) if self._fade_from != target else step_end
+                return
+            self._set_bgm_level(target)
+            # Chain from the scheduled end so a late tick doesn't stretch the sequence
+            self._enter(self._step + 1, step_end)
+
+    def narration_ended(self, now):
+        """Move on to the outro once the narration channel has finished"""
+        if self._step != _NARRATION_STEP or pygame.mixer.Channel(NARRATION_CHANNEL_ID).get_busy():
+            return
+        logger.info("Narration finished")
+        self._narration = None
+        self._enter(self._step + 1, now)
+        self.tick(now)
+
+    def pause(self, now):
+        if self._step is not None and self._paused_at is None:
+            self._paused_at = now
+            pygame.mixer.Channel(NARRATION_CHANNEL_ID).pause()
+
+    def resume(self, now):
+        if self._paused_at is None:
+            return
+        self._step_start += now - self._paused_at
+        self._paused_at = None
+        pygame.mixer.Channel(NARRATION_CHANNEL_ID).unpause()
+        if self._step != _NARRATION_STEP:
+            self._next_tick = now
+
+    def _enter(self, index, start):
+        if index >= len(STORY_STEPS):
+            self.cancel()
+            _bgm_player.stop()
+            logger.debug("Playback completed")
+            return
+        self._step = index
+        self._step_start = start
+        self._fade_from = self.bgm_level
+        if index != _NARRATION_STEP:
+            self._next_tick = start
+            return
+        self._start_narration(start)
+
+    def _start_narration(self, now):
+        self._next_tick = None
+        narration = self._narration
+        if isinstance(narration, Future):
+            if not narration.done():
+                self._next_tick = now + self.DECODE_POLL
+                return
+            narration = self._narration = narration.result()
+            if narration is None:
+                # get_narration_sound() already logged why; end the story without an outro
+                self.cancel()
+                _bgm_player.stop()
+                return
+            narration.set_volume(1.0)  # Master volume is applied on the narration channel
+        try:
+            narration_channel = pygame.mixer.Channel(NARRATION_CHANNEL_ID)
+            narration_channel.play(narration)
+            narration_channel.set_volume(MASTER_VOLUME.value)
+            logger.info("Narration started")
+        except Exception as e:
+            logger.error(f"Narration playback error: {e}")
+            # Skip straight to the outro, as if the narration had ended
+            self._enter(self._step + 1, now)
+
+    def _set_bgm_level(self, level):
+        if level != self.bgm_level:
+            self.bgm_level = level
+            _bgm_player.set_volume(level * MASTER_VOLUME.value)
+
+
+# The one story sequence; its tick()/next_deadline() are driven by box.py's main loop
+STORY_PLAYBACK = StoryPlayback()
+# Decodes a narration that missed the cache while the BGM intro plays
+_DECODE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="narration-decode",
+                                  initializer=drop_inherited_priority)
+
+
+def shutdown_decoders():
+    """
+    Cancel queued narration decodes and wait for the running ones. Call before pygame.quit():
+    a decode still running then blocks on SDL's mixer lock, and interpreter exit joins it forever.
+    """
+    for pool in (_DECODE_POOL, _PRELOAD_DECODE_POOL):
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# Decodes started by prefetch_narration(), keyed like NARRATION_CACHE; each removes itself when done
+_PENDING_DECODES: Dict[str, Future] = {}
+
+
+def prefetch_narration(narration_path):
+    """
+    Start decoding a narration on _DECODE_POOL if it isn't cached, so the decode overlaps
+    the card feedback cues; crossfade_bgm_to_narration() then picks up the pending Future.
+    """
+    key = str(narration_path)
+    if key in NARRATION_CACHE or key in _PENDING_DECODES:
+        return
+    future = _DECODE_POOL.submit(get_narration_sound, narration_path)
+    _PENDING_DECODES[key] = future
+    future.add_done_callback(lambda _, key=key: _PENDING_DECODES.pop(key, None))
+
+
+def pause_story(now):
+    """Pause BGM, narration and the playback sequence's timeline"""
+    _bgm_player.pause()
+    STORY_PLAYBACK.pause(now)
+
+
+def resume_story(now):
+    _bgm_player.unpause()
+    STORY_PLAYBACK.resume(now)
+
+
+def is_bgm_busy():
+    """True while the current story's BGM is playing, on either the BGM channel or the music stream"""
+    return _bgm_player.get_busy()
 
 
 def crossfade_bgm_to_narration(bgm_path, narration_path, tone):
-    """Play BGM with narration using crossfade technique"""
-    global master_volume_level
-    logger.debug(f"Starting crossfade playback: {tone} with master_volume: {master_volume_level:.2f}")
+    """
+    Start BGM and schedule the narration over it; returns without waiting.
+    The intro, fades and outro then run from the main loop via STORY_PLAYBACK.
+
+    Returns:
+        bool: True if playback started
+    """
+    logger.debug("Starting crossfade playback: %s with master_volume: %.2f", tone, MASTER_VOLUME.value)
     
-    # Use cached BGM if available for faster response
-    if tone in BGM_CACHE:
-        logger.debug(f"Using cached BGM for tone: {tone}")
-        pygame.mixer.music.load(str(bgm_path))
+    # Check the file before starting anything, so a missing narration doesn't leave BGM playing
+    key = str(narration_path)
+    with _narration_cache_lock:
+        narration = NARRATION_CACHE.get(key)
+        if narration is not None:
+            NARRATION_CACHE.move_to_end(key)
+    if narration is None:
+        # Possibly still decoding from prefetch_narration(); otherwise start it now
+        narration = _PENDING_DECODES.get(key)
+    if narration is None:
+        if not _audio_file_exists(narration_path):
+            logger.error(f"Narration file not found: {narration_path}")
+            return False
+        # Decode alongside the ~2s BGM intro instead of before it
+        narration = _DECODE_POOL.submit(get_narration_sound, narration_path)
+    
+    global _bgm_player
+    # A decoded loop starts without the MP3 parse music.load() does; the stream covers tones
+    # preload_bgm() hasn't reached yet
+    bgm_sound = BGM_CACHE.get(tone)
+    if bgm_sound is not None:
+        logger.debug("Using cached BGM for tone: %s", tone)
+        _bgm_player = pygame.mixer.Channel(BGM_CHANNEL_ID)
     else:
         try:
             pygame.mixer.music.load(str(bgm_path))
-            # Try to add to cache for future use if not already there
-            if tone not in BGM_CACHE:
-                try:
-                    BGM_CACHE[tone] = pygame.mixer.Sound(str(bgm_path))
-                    logger.debug(f"Added BGM to cache: {tone}")
-                except:
-                    pass  # Non-critical if caching fails
         except Exception as e:
             logger.error(f"Failed to play BGM: {e}")
-            return
-    
-    # Start BGM at intro volume
-    pygame.mixer.music.set_volume(BGM_INTRO_VOLUME * master_volume_level)
-    pygame.mixer.music.play(-1)
-    logger.debug(f"BGM started at volume {BGM_INTRO_VOLUME * master_volume_level:.2f}")
-    
-    # Short intro period (reduced from 1.5s to 1.0s for responsiveness)
-    time.sleep(1.0)
+            return False
+        _bgm_player = pygame.mixer.music
     
-    # Check cache for narration sound
-    narration_path_str = str(narration_path)
-    narration = None
-    
-    if narration_path_str in NARRATION_CACHE:
-        logger.debug(f"Using cached narration: {narration_path.name}")
-        narration = NARRATION_CACHE[narration_path_str]
+    if not isinstance(narration, Future):
+        narration.set_volume(1.0)  # Master volume is applied on the narration channel
+    STORY_PLAYBACK.start(narration, time.monotonic())
+    if bgm_sound is not None:
+        _bgm_player.play(bgm_sound, loops=-1)
     else:
-        try:
-            narration = pygame.mixer.Sound(str(narration_path))
-            # Add to cache for future use
-            NARRATION_CACHE[narration_path_str] = narration
-            logger.debug(f"Added narration to cache: {narration_path.name}")
-        except Exception as e:
-            logger.error(f"Failed to load narration: {e}")
-            stop_bgm()
-            return
-    
-    # Fade BGM to its narration level, scaled by master_volume
-    fade_bgm_to(BGM_NARRATION_VOLUME * master_volume_level, duration=0.75)  # Faster fade
-    logger.debug(f"BGM faded to {BGM_NARRATION_VOLUME * master_volume_level:.2f} for narration")
-    time.sleep(0.2)  # Reduced delay
-    
-    try:
-        narration.set_volume(master_volume_level)  # Set narration volume based on master
-        narration_channel = narration.play()
-        logger.info("Narration started")
-        
-        # Wait for narration to finish
-        while narration_channel and narration_channel.get_busy():
-            time.sleep(0.1)
-        logger.info("Narration finished")
-    except Exception as e:
-        logger.error(f"Narration playback error: {e}")
-    
-    # Raise BGM, scaled by master_volume
-    fade_bgm_to(BGM_INTRO_VOLUME * 0.8 * master_volume_level, duration=1.5)
-    logger.debug(f"BGM raised after narration to {BGM_INTRO_VOLUME * 0.8 * master_volume_level:.2f}")
-    
-    # Let BGM play for a short outro period
-    time.sleep(2.0)
-    
-    # Fade out completely
-    fade_bgm_to(0.0, duration=1.5)
-    time.sleep(1.5)
-    stop_bgm()
-    logger.debug("Playback completed")
+        _bgm_player.play(-1)
+    logger.debug("BGM started at volume %.2f", BGM_INTRO_VOLUME * MASTER_VOLUME.value)
+    return True
+
+
+def stop_all(fadeout_ms=50):
+    """
+    Stop BGM and all sound channels in one pass, with a short fade to avoid an audible pop.
+
+    Args:
+        fadeout_ms (int): Fade duration in milliseconds; 0 stops immediately
+    """
+    STORY_PLAYBACK.cancel()
+    if fadeout_ms > 0:
+        pygame.mixer.music.fadeout(fadeout_ms)
+        pygame.mixer.fadeout(fadeout_ms)
+    else:
+        pygame.mixer.music.stop()
+        pygame.mixer.stop()
+
+
+def stop_story(fadeout_ms=50):
+    """
+    Stop BGM (stream and channel) and the narration channel but leave the feedback channel alone, so a cue
+    started right after (e.g. the transition sound) isn't faded out with the story.
+
+    Args:
+        fadeout_ms (int): Fade duration in milliseconds; 0 stops immediately
+    """
+    STORY_PLAYBACK.cancel()
+    narration_channel = pygame.mixer.Channel(NARRATION_CHANNEL_ID)
+    bgm_channel = pygame.mixer.Channel(BGM_CHANNEL_ID)
+    if fadeout_ms > 0:
+        pygame.mixer.music.fadeout(fadeout_ms)
+        bgm_channel.fadeout(fadeout_ms)
+        narration_channel.fadeout(fadeout_ms)
+    else:
+        pygame.mixer.music.stop()
+        bgm_channel.stop()
+        narration_channel.stop()
 
 
 def play_narration_with_bgm(narration_path, tone):
@@ -247,24 +752,25 @@ def play_narration_with_bgm(narration_path, tone):
         narration_path (Path): Path to narration file
         tone (str): Mood tone for selecting BGM
     """
-    bgm_path = BGM_FOLDER / f"{tone}_loop.mp3"
-    if not bgm_path.exists():
+    if not _ensure_audio_ready():
+        return False
+    bgm_path = BGM_PATHS.get(tone)
+    if bgm_path is None or not _audio_file_exists(bgm_path):
         logger.error(f"BGM not found for tone '{tone}': {bgm_path}")
         return False
     
-    crossfade_bgm_to_narration(bgm_path, narration_path, tone)
-    return True
+    return crossfade_bgm_to_narration(bgm_path, narration_path, tone)
 
 
 def test_audio_performance():
     """Test audio engine performance"""
     logger.info("Testing audio performance...")
     
-    if not pygame.mixer.get_init():
-        initialize_audio_engine()
+    if not _ensure_audio_ready():
+        return
     
     # Test BGM playback
-    bgm_path = BGM_FOLDER / "calmo_loop.mp3"
+    bgm_path = BGM_PATHS["calmo"]
     if bgm_path.exists():
         start_time = time.time()
         pygame.mixer.music.load(str(bgm_path))
@@ -303,138 +809,85 @@ def test_audio_performance():
     else:
         logger.warning("Cannot test Sound performance, no files found")
 
-def play_error_sound():
-    """Play a default error sound if available."""
-    error_path = AUDIO_FOLDER / "error.mp3"
-    if error_path.exists():
+def _load_feedback_sound(filename, path):
+    sound = pygame.mixer.Sound(str(path))
+    sound.set_volume(1.0)
+    _SOUND_CACHE[filename] = sound
+    return sound
+
+
+def preload_feedback_sounds():
+    """Decode every feedback sound into _SOUND_CACHE (for the background preload thread)."""
+    if not _ensure_audio_ready():
+        return
+    for filename in FEEDBACK_SOUNDS:
+        path = AUDIO_FOLDER / filename
+        if filename in _SOUND_CACHE or not _audio_file_exists(path):
+            continue
         try:
-            sound = pygame.mixer.Sound(str(error_path))
-            sound.set_volume(1.0)
-            sound.play()
-            logger.info("Played error sound.")
-            # Wait briefly to let the error sound play
-            pygame.time.wait(700)
+            _load_feedback_sound(filename, path)
         except Exception as e:
-            logger.error(f"Failed to play error sound: {e}")
-    else:
-        logger.error("Error sound file missing: error.mp3")
+            logger.error(f"Failed to preload feedback sound {filename}: {e}")
+    logger.debug("Preloaded %s feedback sounds", len(_SOUND_CACHE))
+
+
+def _play_feedback(filename, label):
+    """
+    Start a feedback sound on the feedback channel and return without waiting.
+    FEEDBACK_END_EVENT is posted when it finishes; a new feedback sound cuts off the current one.
+
+    Returns:
+        bool: True if the sound started (so a FEEDBACK_END_EVENT will follow)
+    """
+    if not _ensure_audio_ready():
+        return False
+    path = AUDIO_FOLDER / filename
+    if not _audio_file_exists(path):
+        logger.warning(f"{label.capitalize()} sound file missing: {filename}")
+        return False
+    try:
+        sound = _SOUND_CACHE.get(filename)
+        if sound is None:
+            sound = _load_feedback_sound(filename, path)
+        pygame.mixer.Channel(FEEDBACK_CHANNEL_ID).play(sound)
+        logger.info(f"Played {label} sound.")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to play {label} sound: {e}")
+        return False
+
+def play_error_sound():
+    """Play a default error sound if available."""
+    return _play_feedback("error.mp3", "error")
 
 def play_boot_sound():
     """Play a sound at system boot."""
-    path = AUDIO_FOLDER / "boot.mp3"
-    if path.exists():
-        try:
-            sound = pygame.mixer.Sound(str(path))
-            sound.set_volume(1.0) # Consider making this configurable or use master_volume_level
-            sound.play()
-            logger.info("Played boot sound.")
-            # pygame.time.wait(600) # REMOVED - box.py will handle waiting by checking pygame.mixer.get_busy() and pumping events
-        except Exception as e:
-            logger.error(f"Failed to play boot sound: {e}")
-    else:
-        logger.warning("Boot sound file missing: boot.mp3")
+    return _play_feedback("boot.mp3", "boot")
 
 def play_card_valid_sound():
     """Play a sound for valid card recognition."""
-    path = AUDIO_FOLDER / "card_valid.mp3"
-    if path.exists():
-        try:
-            sound = pygame.mixer.Sound(str(path))
-            sound.set_volume(1.0)
-            sound.play()
-            logger.info("Played card valid sound.")
-            # pygame.time.wait(400) # REMOVED - box.py can handle waiting if needed
-        except Exception as e:
-            logger.error(f"Failed to play card valid sound: {e}")
-    else:
-        logger.warning("Card valid sound file missing: card_valid.mp3")
+    return _play_feedback("card_valid.mp3", "card valid")
 
 def play_card_invalid_sound():
     """Play a sound for invalid card recognition."""
-    path = AUDIO_FOLDER / "card_invalid.mp3"
-    if path.exists():
-        try:
-            sound = pygame.mixer.Sound(str(path))
-            sound.set_volume(1.0)
-            sound.play()
-            logger.info("Played card invalid sound.")
-            # pygame.time.wait(400) # REMOVED
-        except Exception as e:
-            logger.error(f"Failed to play card invalid sound: {e}")
-    else:
-        logger.warning("Card invalid sound file missing: card_invalid.mp3")
+    return _play_feedback("card_invalid.mp3", "card invalid")
 
 def play_transition_sound():
     """Play a short transition sound between stories."""
-    path = AUDIO_FOLDER / "transition.mp3"
-    if path.exists():
-        try:
-            sound = pygame.mixer.Sound(str(path))
-            sound.set_volume(1.0)
-            sound.play()
-            logger.info("Played transition sound.")
-            # pygame.time.wait(350) # REMOVED
-        except Exception as e:
-            logger.error(f"Failed to play transition sound: {e}")
-    else:
-        logger.warning("Transition sound file missing: transition.mp3")
+    return _play_feedback("transition.mp3", "transition")
 
 def play_shutdown_sound():
     """Play a sound at system shutdown."""
-    path = AUDIO_FOLDER / "shutdown.mp3"
-    if path.exists():
-        try:
-            sound = pygame.mixer.Sound(str(path))
-            sound.set_volume(1.0)
-            sound.play()
-            logger.info("Played shutdown sound.")
-            # pygame.time.wait(600) # REMOVED
-        except Exception as e:
-            logger.error(f"Failed to play shutdown sound: {e}")
-    else:
-        logger.warning("Shutdown sound file missing: shutdown.mp3")
+    return _play_feedback("shutdown.mp3", "shutdown")
 
 def play_pause_sound():
     """Play a sound when pausing playback."""
-    path = AUDIO_FOLDER / "pause.mp3"
-    if path.exists():
-        try:
-            sound = pygame.mixer.Sound(str(path))
-            sound.set_volume(1.0)
-            sound.play()
-            logger.info("Played pause sound.")
-            # pygame.time.wait(350) # REMOVED
-        except Exception as e:
-            logger.error(f"Failed to play pause sound: {e}")
-    else:
-        logger.warning("Pause sound file missing: pause.mp3")
+    return _play_feedback("pause.mp3", "pause")
 
 def play_resume_sound():
     """Play a sound when resuming playback."""
-    path = AUDIO_FOLDER / "resume.mp3"
-    if path.exists():
-        try:
-            sound = pygame.mixer.Sound(str(path))
-            sound.set_volume(1.0)
-            sound.play()
-            logger.info("Played resume sound.")
-            # pygame.time.wait(350) # REMOVED
-        except Exception as e:
-            logger.error(f"Failed to play resume sound: {e}")
-    else:
-        logger.warning("Resume sound file missing: resume.mp3")
+    return _play_feedback("resume.mp3", "resume")
 
 def play_success_sound():
     """Play a sound for successful operations."""
-    path = AUDIO_FOLDER / "success.mp3"
-    if path.exists():
-        try:
-            sound = pygame.mixer.Sound(str(path))
-            sound.set_volume(1.0)
-            sound.play()
-            logger.info("Played success sound.")
-            # pygame.time.wait(400) # REMOVED
-        except Exception as e:
-            logger.error(f"Failed to play success sound: {e}")
-    else:
-        logger.warning("Success sound file missing: success.mp3")
+    return _play_feedback("success.mp3", "success")
@@ -1,8 +1,7 @@
 import pygame
-from pathlib import Path
 import time
 
-BGM_FOLDER = Path(__file__).parent / "bgm"
+from config.app_config import BGM_FOLDER, BGM_EXTENSIONS
 
 TONE_TO_BGM = {
     "calmo": "calmo_loop.mp3",
@@ -13,6 +12,19 @@ TONE_TO_BGM = {
     "tenero": "tenero_loop.mp3",
 }
 
+
+def _bgm_path(filename):
+    """The loop's path, preferring a transcoded copy next to the MP3 if there is one"""
+    path = BGM_FOLDER / filename
+    for candidate in (path.with_suffix(ext) for ext in BGM_EXTENSIONS):
+        if candidate.is_file():
+            return candidate
+    return path
+
+
+# Tone -> BGM path, built once so a story start doesn't join paths
+BGM_PATHS = {tone: _bgm_path(filename) for tone, filename in TONE_TO_BGM.items()}
+
 BGM_INTRO_VOLUME = 0.7
 BGM_NARRATION_VOLUME = 0.10  # Was 0.15
 BGM_OUTRO_VOLUME = 0.2
@@ -21,8 +33,7 @@ def get_bgm_file_for_tone(tone):
     """
     Return the BGM file path for a given story tone.
     """
-    filename = TONE_TO_BGM.get(tone.lower(), "calmo_loop.mp3")
-    return BGM_FOLDER / filename
+    return BGM_PATHS.get(tone.lower(), BGM_PATHS["calmo"])
 
 def play_bgm_loop(bgm_path, volume=0.7):
     """
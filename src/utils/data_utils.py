@@ -5,41 +5,144 @@ Handles JSON loading, file verification, and data validation.
 """
 
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from config.app_config import STORIES_FOLDER, BGM_FOLDER, AUDIO_FOLDER, AVAILABLE_TONES
+from types import MappingProxyType
+from config.app_config import BASE_DIR, STORIES_FOLDER, BGM_FOLDER, BGM_EXTENSIONS, AUDIO_FOLDER, AVAILABLE_TONES
 import logging
 from utils.log_utils import logger
 
+# orjson parses 2-3x faster than the stdlib; fall back if it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
-# Global card data cache
-CARD_DATA_CACHE = {}
+
+# Threads reading card files in preload_card_data()
+CARD_READ_WORKERS = 4
+
+# Absolute paths of every regular file under the audio and BGM folders, from one directory
+# scan on first use; a path missing from it falls back to is_file() and is added if found
+_AUDIO_INDEX: set[str] | None = None
+# Held while the index is built, so the preload and verify threads don't both scan the SD card
+_AUDIO_INDEX_LOCK = threading.Lock()
+
+
+def _build_audio_index():
+    index = set()
+    folders = [str(AUDIO_FOLDER), str(BGM_FOLDER)]
+    while folders:
+        try:
+            with os.scandir(folders.pop()) as entries:
+                for entry in entries:
+                    # Like os.walk(), don't descend into symlinked folders; is_file() skips FIFOs,
+                    # sockets and broken links, and needs no stat() for regular files
+                    if entry.is_dir(follow_symlinks=False):
+                        folders.append(entry.path)
+                    elif entry.is_file():
+                        index.add(entry.path)
+        except OSError as e:
+            logger.warning(f"Failed to index audio folder: {e}")
+    logger.debug("Indexed %d audio files", len(index))
+    return index
+
+
+def audio_file_exists(path):
+    """
+    Path.is_file() for audio files, answered from the directory index instead of a stat() per file.
+
+    Args:
+        path (Path | str): Absolute path under AUDIO_FOLDER or BGM_FOLDER
+    """
+    global _AUDIO_INDEX
+    index = _AUDIO_INDEX
+    if index is None:
+        with _AUDIO_INDEX_LOCK:
+            if _AUDIO_INDEX is None:
+                _AUDIO_INDEX = _build_audio_index()
+            index = _AUDIO_INDEX
+    key = str(path)
+    if key in index:
+        return True
+    if os.path.isfile(key):
+        index.add(key)
+        return True
+    return False
+
+
+# Global card data cache (read-only view, replaced wholesale on update so
+# readers on other threads never see a half-built dict)
+CARD_DATA_CACHE = MappingProxyType({})
+# st_mtime_ns of each cached card file, so an edited card is re-read without a restart
+_CARD_MTIMES: dict[str, int] = {}
+
+
+def _publish_card_data(uid, data, mtime_ns):
+    """Add one card to the cache by swapping in a new read-only mapping"""
+    global CARD_DATA_CACHE
+    updated = dict(CARD_DATA_CACHE)
+    updated[uid] = data
+    _CARD_MTIMES[uid] = mtime_ns
+    CARD_DATA_CACHE = MappingProxyType(updated)
+
+
+def _resolve_story_paths(card_data):
+    """
+    Attach each story's absolute audio path and whether the file exists, so a card
+    tap reads story["audio_path"] / story["ok"] instead of building a Path and stat()ing it.
+    Also split the stories into the calm and active candidate pools used by
+    select_story_for_card() in the same pass.
+    """
+    stories = card_data.get("stories", [])
+    calm, active = [], []
+    for story in stories:
+        audio = story.get("audio")
+        audio_path = BASE_DIR / audio if audio else None
+        story["audio_path"] = audio_path
+        story["ok"] = audio_path is not None and audio_file_exists(audio_path)
+        (calm if story.get("tone", "").lower() == "calmo" else active).append(story)
+    # Same fallbacks as select_story_for_time(): any story if no tone-matching one exists
+    card_data["calm_stories"] = calm or stories
+    card_data["active_stories"] = active or stories
+    return card_data
+
+
+def _read_card_file(path):
+    """stat, read and parse one card file; runs on preload_card_data()'s pool"""
+    return path.stat().st_mtime_ns, _json_loads(path.read_bytes())
 
 
 def preload_card_data():
-    """Preload card JSON data into memory for faster access"""
+    """Preload all card JSON data into memory so card taps never touch the SD card"""
+    global CARD_DATA_CACHE
     logger.debug("Starting card data preload...")
-    cards_loaded = 0
+    cards = dict(CARD_DATA_CACHE)
     
-    # Preload first 10 cards (or fewer if some don't exist)
-    for i in range(10):
-        uid = f"{i:06d}"
-        path = STORIES_FOLDER / f"card_{uid}.json"
-        
-        if path.exists():
+    # Overlap the SD card round-trips of the file reads; paths are resolved here afterwards
+    paths = list(STORIES_FOLDER.glob("card_*.json"))
+    with ThreadPoolExecutor(max_workers=CARD_READ_WORKERS, thread_name_prefix="card-read") as pool:
+        for path, future in [(path, pool.submit(_read_card_file, path)) for path in paths]:
+            uid = path.stem[len("card_"):]
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    CARD_DATA_CACHE[uid] = json.load(f)
-                cards_loaded += 1
-                logger.debug(f"Preloaded card data: {uid}")
+                mtime_ns, card_data = future.result()
+                _CARD_MTIMES[uid] = mtime_ns
+                cards[uid] = _resolve_story_paths(card_data)
+                logger.debug("Preloaded card data: %s", uid)
             except Exception as e:
                 logger.error(f"Failed to preload card data for {uid}: {e}")
     
-    logger.info(f"Preloaded {cards_loaded} card data files")
+    CARD_DATA_CACHE = MappingProxyType(cards)
+    logger.info(f"Preloaded {len(cards)} card data files")
 
 
 def load_card_stories(uid: str) -> dict | None:
     """
     Load stories for a card from JSON file or cache.
+    The cache is keyed on the file's mtime, so a hit costs one stat() and no read or parse.
     
     Args:
         uid (str): Card UID
@@ -47,29 +150,30 @@ def load_card_stories(uid: str) -> dict | None:
     Returns:
         dict or None: Card data if found and valid, None otherwise
     """
-    # First check cache
-    if uid in CARD_DATA_CACHE:
-        logger.debug(f"Using cached card data for {uid}")
-        return CARD_DATA_CACHE[uid]
-    
-    # If not in cache, load from file
     path = STORIES_FOLDER / f"card_{uid}.json"
-    logger.debug(f"Looking for JSON file: {path}")
-    
-    if not path.exists():
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
         logger.error(f"JSON file not found: {path}")
         return None
-        
+    
+    # First check cache
+    data = CARD_DATA_CACHE.get(uid)
+    if data is not None and _CARD_MTIMES.get(uid) == mtime_ns:
+        logger.debug("Using cached card data for %s", uid)
+        return data
+    
+    # If not in cache (or the file changed), load from file
+    logger.debug("Looking for JSON file: %s", path)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            logger.info(f"Successfully loaded JSON for card {uid}")
-            # Add to cache for future use
-            CARD_DATA_CACHE[uid] = data
-            return data
+        data = _resolve_story_paths(_json_loads(path.read_bytes()))
+        logger.info(f"Successfully loaded JSON for card {uid}")
+        # Add to cache for future use
+        _publish_card_data(uid, data, mtime_ns)
+        return data
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON format in {path}: {e}")
-        logger.debug(f"Error at line {e.lineno}, column {e.colno}: {e.msg}")
+        logger.debug("Error at line %s, column %s: %s", e.lineno, e.colno, e.msg)
         return None
     except Exception as e:
         logger.error(f"Failed to read {path}: {e}")
@@ -83,9 +187,8 @@ def verify_audio_files() -> None:
     # Check BGM files
     bgm_folder = BGM_FOLDER
     missing_bgm = []
-    for tone in ["calmo", "avventuroso", "divertente", "misterioso", "tenero"]:
-        bgm_path = bgm_folder / f"{tone}_loop.mp3"
-        if not bgm_path.exists():
+    for tone in AVAILABLE_TONES:
+        if not any(audio_file_exists(bgm_folder / f"{tone}_loop{ext}") for ext in BGM_EXTENSIONS):
             missing_bgm.append(tone)
     
     if missing_bgm:
@@ -99,22 +202,15 @@ def verify_audio_files() -> None:
     invalid_audio = []
     stories_checked = 0
     
-    for json_file in stories_folder.glob("*.json"):
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                card_data = json.load(f)
-            
-            if "stories" in card_data:
-                for story in card_data["stories"]:
-                    stories_checked += 1
-                    if "audio" in story:
-                        audio_path = stories_folder.parent / story["audio"]
-                        if not audio_path.exists():
-                            invalid_audio.append(f"{story['title']} ({audio_path})")
-        except json.JSONDecodeError:
-            logger.error(f"Invalid JSON format in {json_file}")
-        except Exception as e:
-            logger.error(f"Failed to process {json_file}: {e}")
+    for json_file in stories_folder.glob("card_*.json"):
+        # Through the card cache, so cards the preload already parsed and stat()ed aren't re-read
+        card_data = load_card_stories(json_file.stem[len("card_"):])
+        if card_data is None:
+            continue  # load_card_stories() logged why
+        for story in card_data.get("stories", []):
+            stories_checked += 1
+            if story.get("audio") and not story["ok"]:
+                invalid_audio.append(f"{story['title']} ({story['audio_path']})")
     
     if invalid_audio:
         logger.warning(f"Missing audio files: {len(invalid_audio)}/{stories_checked} stories")
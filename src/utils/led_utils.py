@@ -6,13 +6,49 @@ for visual feedback about system states.
 
 import time
 import math
+import threading
 from typing import Callable, Optional, List
 
+# One breathing cycle as PWM duty (10-100%), indexed by phase (0-255).
+# Gamma-corrected so the ramp looks even to the eye instead of lingering near full brightness.
+BREATHING_TABLE_SIZE = 256
+BREATHING_TABLE = tuple(
+    10 + 90 * (0.5 * (1 - math.cos(2 * math.pi * i / BREATHING_TABLE_SIZE))) ** 2.2
+    for i in range(BREATHING_TABLE_SIZE)
+)
+
+
+class PatternSpec:
+    """
+    A pattern name and its set_pattern() arguments, built once and reused.
+    Specs compare by identity, so LedPatternManager.apply() can skip re-applying the spec already showing.
+    """
+    __slots__ = ('pattern', 'kwargs')
+
+    def __init__(self, pattern, **kwargs):
+        self.pattern = pattern
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        return f"PatternSpec({self.pattern!r}, {self.kwargs!r})"
+
+
+# Patterns used by the main application
+BREATHE_IDLE = PatternSpec('breathing', period=2.5)
+SOLID_ON = PatternSpec('solid', state=True)
+FADE_TO_IDLE = PatternSpec('fadeout', duration=1.0, next_pattern='breathing')
+BLINK_AUDIO_FAILURE = PatternSpec('blink', period=0.15, duty=0.5)
+BLINK_HARDWARE_FAILURE = PatternSpec('blink', period=0.1, duty=0.5)
+FLASH_EMPTY_CARD = PatternSpec('colorshift', levels=[50, 0, 50, 0], duration=0.2, count=3, next_pattern='breathing')
+FLASH_CARD_ERROR = PatternSpec('colorshift', levels=[100, 0, 100, 0], duration=0.2, count=3, next_pattern='breathing')
+PULSE_NETWORK_ERROR = PatternSpec('pulse', count=3, next_pattern='breathing')
+
 
 class LedPatternManager:
     """
     Manages LED feedback patterns for the button LED.
-    Call update() frequently from the main loop to keep the pattern smooth.
+    Run run() on a dedicated thread to keep the pattern smooth; set_pattern()
+    wakes it immediately, and it sleeps indefinitely while the LED is static.
     
     Supported patterns:
     - solid: Static on/off
@@ -32,9 +68,17 @@ class LedPatternManager:
     - success: Visual indication of successful operation (3 ascending pulses)
     - error: Visual indication of error (decreasing brightness pulses)
     """
+    # Patterns that need no per-frame updates once set
+    STATIC_PATTERNS = ('solid', 'off')
+
     def __init__(self, button):
         self.button = button
+        # Reentrant: update() calls set_pattern() for auto-transitions
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
         self.pattern = 'solid'  # Current pattern name
+        self._active_spec = None  # PatternSpec last applied, until the pattern changes
         self.last_update = time.monotonic()
         self.blink_on = False
         self.blink_period = 1.0
@@ -42,6 +86,7 @@ class LedPatternManager:
         self.breathing_period = 2.5
         self.solid_state = True
         self._last_breath = 0
+        self._last_written_duty = None  # Last duty sent to the PWM, in whole percent
         self._blink_count = 0
         self._blink_target = None
         self._blink_callback = None
@@ -139,7 +184,25 @@ class LedPatternManager:
                 - levels (list): For custom brightness levels
                 - sequence (list): For custom pattern sequences
         """
+        with self._lock:
+            if (pattern == 'breathing' and self.pattern == 'breathing'
+                    and self.breathing_period == kwargs.get('period', 2.5)):
+                return  # Already breathing; re-initializing would reset the phase
+            self._set_pattern(pattern, **kwargs)
+        self._wake.set()
+
+    def apply(self, spec):
+        """Show a PatternSpec; does nothing if that spec is already the active pattern"""
+        with self._lock:
+            if spec is self._active_spec:
+                return
+            self.set_pattern(spec.pattern, **spec.kwargs)
+            self._active_spec = spec
+
+    def _set_pattern(self, pattern, **kwargs):
         self.pattern = pattern
+        self._active_spec = None
+        self._last_written_duty = None  # Each pattern (re)starts or stops the PWM itself
         self.last_update = time.monotonic()
         self._next_pattern = kwargs.get('next_pattern', None)
         self._transition_callback = kwargs.get('callback', None)
@@ -253,8 +316,32 @@ class LedPatternManager:
             self.button.set_led(False)
             self.button.stop_led_pwm()
 
+    def run(self, frame_period=1 / 30):
+        """
+        Drive LED animations until stop() is called. Intended as a thread target.
+
+        Args:
+            frame_period (float): Seconds between animation frames
+        """
+        while not self._stop_event.is_set():
+            # Clear before updating so a set_pattern() during update isn't lost
+            self._wake.clear()
+            with self._lock:
+                self._update()
+                timeout = None if self.pattern in self.STATIC_PATTERNS else frame_period
+            self._wake.wait(timeout)
+
+    def stop(self):
+        """Stop the run() loop"""
+        self._stop_event.set()
+        self._wake.set()
+
     def update(self):
-        """Update LED pattern state - call this frequently from main loop"""
+        """Update LED pattern state - called once per frame by run()"""
+        with self._lock:
+            self._update()
+
+    def _update(self):
         now = time.monotonic()
         
         if self.pattern == 'solid':
@@ -292,10 +379,9 @@ class LedPatternManager:
                     self.last_update = now
                     
         elif self.pattern == 'breathing':
-            t = (now - self._last_breath) % self.breathing_period
-            # Breathing: duty cycle varies sinusoidally between 10% and 100%
-            duty = 10 + 90 * 0.5 * (1 - math.cos(2 * math.pi * t / self.breathing_period))
-            self.button.change_led_pwm_duty_cycle(duty)
+            # Breathing: duty cycle follows the precomputed curve between 10% and 100%
+            phase = int((now - self._last_breath) / self.breathing_period * BREATHING_TABLE_SIZE)
+            self._write_duty(BREATHING_TABLE[phase & (BREATHING_TABLE_SIZE - 1)])
             
         elif self.pattern == 'pulse':
             # Pulse: Quick rise, longer fall
@@ -308,12 +394,12 @@ class LedPatternManager:
                 
             elif t < 0.2:  # Fast rise (25% of pulse)
                 duty = min(100, t * 500)  # 0 to 100 in 0.2s
-                self.button.change_led_pwm_duty_cycle(duty)
+                self._write_duty(duty)
                 
             else:  # Slower fall (75% of pulse)
                 decay = (t - 0.2) / 0.6  # 0 to 1 over 0.6s
                 duty = max(0, 100 * (1 - decay))
-                self.button.change_led_pwm_duty_cycle(duty)
+                self._write_duty(duty)
                 
         elif self.pattern == 'heartbeat':
             # Double pulse like a heartbeat
@@ -321,28 +407,28 @@ class LedPatternManager:
             
             if t < 0.15:  # First beat rise
                 duty = min(100, t * 667)  # 0 to 100 in 0.15s
-                self.button.change_led_pwm_duty_cycle(duty)
+                self._write_duty(duty)
                 
             elif t < 0.3:  # First beat fall
                 decay = (t - 0.15) / 0.15
                 duty = max(0, 100 * (1 - decay))
-                self.button.change_led_pwm_duty_cycle(duty)
+                self._write_duty(duty)
                 
             elif t < 0.45:  # Brief pause
-                self.button.change_led_pwm_duty_cycle(0)
+                self._write_duty(0)
                 
             elif t < 0.6:  # Second beat rise
                 rise = (t - 0.45) / 0.15
                 duty = min(100, rise * 100)
-                self.button.change_led_pwm_duty_cycle(duty)
+                self._write_duty(duty)
                 
             elif t < 0.8:  # Second beat fall
                 decay = (t - 0.6) / 0.2
                 duty = max(0, 100 * (1 - decay))
-                self.button.change_led_pwm_duty_cycle(duty)
+                self._write_duty(duty)
                 
             else:  # Long pause
-                self.button.change_led_pwm_duty_cycle(0)
+                self._write_duty(0)
                 
         elif self.pattern == 'morse':
             if not self._morse_pattern:
@@ -400,7 +486,7 @@ class LedPatternManager:
         elif self.pattern == 'fadeout':
             elapsed = now - self._fadeout_start
             if elapsed >= self._fadeout_duration:
-                self.button.change_led_pwm_duty_cycle(0)
+                self._write_duty(0)
                 if self._next_pattern:
                     self.set_pattern(self._next_pattern)
                 else:
@@ -408,7 +494,7 @@ class LedPatternManager:
             else:
                 progress = elapsed / self._fadeout_duration
                 duty = self._fadeout_initial * (1 - progress)
-                self.button.change_led_pwm_duty_cycle(duty)
+                self._write_duty(duty)
                 
         elif self.pattern == 'sos':
             elapsed = now - self.last_update
@@ -431,7 +517,7 @@ class LedPatternManager:
         elif self.pattern == 'progress':
             # Progress indicator updates periodically
             if now - self._progress_update_time > 0.05:  # Update every 50ms
-                self.button.change_led_pwm_duty_cycle(self._calculate_progress_duty())
+                self._write_duty(self._calculate_progress_duty())
                 self._progress_update_time = now
                 
         elif self.pattern == 'rainbow':
@@ -442,7 +528,7 @@ class LedPatternManager:
             self._rainbow_hue = (elapsed * 90 * self._rainbow_speed) % 360
             # Map hue to brightness using a sine wave for smooth transitions
             brightness = 50 + 50 * math.sin(math.radians(self._rainbow_hue))
-            self.button.change_led_pwm_duty_cycle(brightness)
+            self._write_duty(brightness)
             
         elif self.pattern == 'colorshift':
             # Shift between different brightness levels to simulate color shifting
@@ -450,7 +536,7 @@ class LedPatternManager:
             if elapsed >= self._colorshift_duration:
                 self._colorshift_index = (self._colorshift_index + 1) % len(self._colorshift_values)
                 new_brightness = self._colorshift_values[self._colorshift_index]
-                self.button.change_led_pwm_duty_cycle(new_brightness)
+                self._write_duty(new_brightness)
                 self._colorshift_last_change = now
                 
                 # Check for pattern completion
@@ -466,7 +552,7 @@ class LedPatternManager:
             # Visual countdown timer
             elapsed = now - self._countdown_start
             if elapsed >= self._countdown_duration:
-                self.button.change_led_pwm_duty_cycle(0)
+                self._write_duty(0)
                 if self._next_pattern:
                     self.set_pattern(self._next_pattern)
                 else:
@@ -475,7 +561,7 @@ class LedPatternManager:
                 # Linear decrease in brightness
                 progress = elapsed / self._countdown_duration
                 brightness = self._countdown_initial_brightness * (1 - progress)
-                self.button.change_led_pwm_duty_cycle(brightness)
+                self._write_duty(brightness)
                 
         elif self.pattern == 'attention':
             # Attention-grabbing pattern
@@ -487,7 +573,7 @@ class LedPatternManager:
                 # Move to next phase
                 self._attention_phase = (self._attention_phase + 1) % len(self._attention_sequence)
                 next_brightness = self._attention_sequence[self._attention_phase][0]
-                self.button.change_led_pwm_duty_cycle(next_brightness)
+                self._write_duty(next_brightness)
                 self._attention_last_change = now
                 
                 # Check for pattern completion (one full cycle)
@@ -509,7 +595,7 @@ class LedPatternManager:
                 # Move to next phase
                 self._success_phase = (self._success_phase + 1) % len(self._success_sequence)
                 next_brightness = self._success_sequence[self._success_phase][0]
-                self.button.change_led_pwm_duty_cycle(next_brightness)
+                self._write_duty(next_brightness)
                 self._success_last_change = now
                 
                 # Check for pattern completion (one full cycle)
@@ -531,7 +617,7 @@ class LedPatternManager:
                 # Move to next phase
                 self._error_phase = (self._error_phase + 1) % len(self._error_sequence)
                 next_brightness = self._error_sequence[self._error_phase][0]
-                self.button.change_led_pwm_duty_cycle(next_brightness)
+                self._write_duty(next_brightness)
                 self._error_last_change = now
                 
                 # Check for pattern completion (one full cycle)
@@ -547,6 +633,13 @@ class LedPatternManager:
             # Unknown pattern defaults to off
             self.button.set_led(False)
 
+    def _write_duty(self, duty):
+        """Set the PWM duty cycle, skipping the hardware write if the whole-percent value is unchanged"""
+        duty = int(duty)
+        if duty != self._last_written_duty:
+            self.button.change_led_pwm_duty_cycle(duty)
+            self._last_written_duty = duty
+
     def _calculate_progress_duty(self):
         """Calculate duty cycle for progress pattern"""
         # Map progress percentage to duty cycle with a minimum brightness
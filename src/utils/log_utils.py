@@ -3,6 +3,7 @@ Logging utilities for Storyteller Box.
 Configures structured logging with rotation.
 """
 import logging
+import os
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
@@ -10,7 +11,10 @@ LOG_FILE = Path(__file__).parent.parent / "storyteller.log"
 
 # Configure root logger
 logger = logging.getLogger("storyteller")
-logger.setLevel(logging.DEBUG)
+# INFO by default, so logger.debug() calls in the playback path return before formatting or
+# writing to the SD card; STORYTELLER_LOG_LEVEL=DEBUG brings the debug output back
+LOG_LEVEL = logging.getLevelName(os.environ.get("STORYTELLER_LOG_LEVEL", "INFO").upper())
+logger.setLevel(LOG_LEVEL if isinstance(LOG_LEVEL, int) else logging.INFO)
 
 # Rotating file handler: 1MB per file, keep 5 backups
 file_handler = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=5)
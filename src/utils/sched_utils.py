@@ -0,0 +1,121 @@
+"""
+Scheduling utilities for Storyteller Box.
+Raises the audio, LED and main threads to real-time (SCHED_FIFO) priority on Linux so
+playback, PWM updates and input handling aren't starved by other processes.
+Needs root or CAP_SYS_NICE; without it the threads keep normal priority.
+Threads inherit their creator's policy, so workers that may be started after the main
+thread is elevated call drop_inherited_priority() first (e.g. as a pool initializer).
+"""
+
+import os
+from pathlib import Path
+
+from utils.log_utils import logger
+
+# Nice value threads normally run at, read at import before any thread is elevated
+_BASE_NICE = os.nice(0) if hasattr(os, "nice") else 0
+
+
+def set_realtime_priority(priority, tid=0):
+    """
+    Switch a thread to SCHED_FIFO.
+
+    Args:
+        priority (int): Real-time priority (1-99)
+        tid (int): Native thread id; 0 means the calling thread
+
+    Returns:
+        bool: True if the scheduler was changed
+    """
+    if not hasattr(os, "sched_setscheduler"):
+        return False
+    try:
+        os.sched_setscheduler(tid, os.SCHED_FIFO, os.sched_param(priority))
+        return True
+    except PermissionError:
+        logger.warning("No permission for SCHED_FIFO (run as root or grant CAP_SYS_NICE)")
+    except OSError as e:
+        logger.warning(f"Failed to set SCHED_FIFO on thread {tid or 'self'}: {e}")
+    return False
+
+
+def find_native_threads(name_prefix):
+    """Return the native ids of this process's threads whose name starts with name_prefix (Linux only)."""
+    tids = []
+    task_dir = Path("/proc/self/task")
+    if not task_dir.exists():
+        return tids
+    for task in task_dir.iterdir():
+        try:
+            if (task / "comm").read_text().startswith(name_prefix):
+                tids.append(int(task.name))
+        except (OSError, ValueError):
+            continue  # Thread exited while iterating
+    return tids
+
+
+def prioritize_audio_threads(priority):
+    """
+    Raise SDL's audio device thread(s) to SCHED_FIFO.
+    Call after the mixer is initialized, since SDL starts the thread when it opens the device.
+    """
+    tids = find_native_threads("SDLAudio")
+    if not tids:
+        logger.warning("SDL audio thread not found, leaving audio at normal priority")
+        return False
+    raised = [tid for tid in tids if set_realtime_priority(priority, tid)]
+    if raised:
+        logger.info(f"SDL audio thread(s) {raised} set to SCHED_FIFO priority {priority}")
+    return bool(raised)
+
+
+def elevate_current_thread(priority, fallback_nice=-10):
+    """
+    Give the calling thread SCHED_FIFO, or a negative nice value if that isn't allowed.
+
+    Args:
+        priority (int): Real-time priority (1-99)
+        fallback_nice (int): Nice increment to try when SCHED_FIFO fails
+
+    Returns:
+        str | None: "fifo", "nice" or None; pass it to restore_current_thread()
+    """
+    if set_realtime_priority(priority):
+        logger.info(f"Main thread set to SCHED_FIFO priority {priority}")
+        return "fifo"
+    if not hasattr(os, "nice"):
+        return None
+    try:
+        os.nice(fallback_nice)
+        logger.info(f"Main thread nice adjusted by {fallback_nice}")
+        return "nice"
+    except OSError as e:
+        logger.warning(f"Failed to raise main thread priority: {e}")
+    return None
+
+
+def drop_inherited_priority():
+    """
+    Put the calling thread back on SCHED_OTHER at the normal nice value, undoing whatever it
+    inherited from an elevated creator. A no-op for threads already at normal priority.
+    """
+    try:
+        if hasattr(os, "sched_getscheduler") and os.sched_getscheduler(0) != os.SCHED_OTHER:
+            os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+        if hasattr(os, "nice"):
+            boost = _BASE_NICE - os.nice(0)
+            if boost > 0:
+                os.nice(boost)  # Raising nice needs no privileges
+    except OSError as e:
+        logger.warning(f"Failed to drop inherited thread priority: {e}")
+
+
+def restore_current_thread(mode, fallback_nice=-10):
+    """Undo elevate_current_thread() so the calling thread runs at normal priority again"""
+    try:
+        if mode == "fifo":
+            os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+        elif mode == "nice":
+            os.nice(-fallback_nice)
+    except OSError as e:
+        logger.warning(f"Failed to restore main thread priority: {e}")
@@ -4,42 +4,38 @@ Provides logic to pick a story from a list, optionally filtered by tone or other
 """
 
 import json
+import logging
 import random
-from pathlib import Path
+
+from config.app_config import STORIES_FOLDER
+from utils.log_utils import logger
+
+# Story picks use their own generator, so other code drawing from random can't shift them
+# and a test can seed it
+STORY_RNG = random.Random()
 
 def load_card_stories(uid):
-    base = Path.cwd() / "src" / "storiesoffline"  # Corrected path
-    print(f"[DEBUG] Listing files in: {base}")
-    print(f"[DEBUG] Files: {list(base.glob('*.json'))}")
-    path = base / f"card_{uid}.json"
-    print(f"[DEBUG] Looking for JSON file: {path}")
+    path = STORIES_FOLDER / f"card_{uid}.json"
+    logger.debug("Looking for JSON file: %s", path)
     if not path.exists():
-        print(f"[ERROR] JSON file not found: {path}")
+        logger.error(f"JSON file not found: {path}")
         return None
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
-        print(f"[DEBUG] Loaded JSON data: {data}")
+        logger.debug("Loaded JSON data: %s", data)
         return data
 
 def pick_story(stories, tone=None, exclude_tone=None):
     if tone:
         filtered = [s for s in stories if s.get("tone", "").lower() == tone.lower()]
-        print(f"Filtered stories for tone '{tone}': {[s['title'] for s in filtered]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Filtered stories for tone '%s': %s", tone, [s['title'] for s in filtered])
         if filtered:
-            return random.choice(filtered)
+            return STORY_RNG.choice(filtered)
     elif exclude_tone:
         filtered = [s for s in stories if s.get("tone", "").lower() != exclude_tone.lower()]
-        print(f"Filtered stories excluding tone '{exclude_tone}': {[s['title'] for s in filtered]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Filtered stories excluding tone '%s': %s", exclude_tone, [s['title'] for s in filtered])
         if filtered:
-            return random.choice(filtered)
-    return random.choice(stories)
-
-# Debugging JSON validation
-base = Path.cwd() / "src" / "storiesoffline"  # Corrected path for validation loop
-for json_file in base.glob("*.json"):
-    try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        print(f"[VALID] {json_file}")
-    except json.JSONDecodeError as e:
-        print(f"[INVALID] {json_file}: {e}")
\ No newline at end of file
+            return STORY_RNG.choice(filtered)
+    return STORY_RNG.choice(stories)
@@ -8,20 +8,31 @@ import time
 import random
 import os
 from config.app_config import CALM_TIME_START, CALM_TIME_END
-from utils.story_utils import pick_story
-from utils.audio_utils import stop_bgm
+from utils.story_utils import pick_story, STORY_RNG
+from utils.audio_utils import stop_all
 from hardware.hal import MCP3008, AnalogIn
+from utils.log_utils import logger
+
+
+# Calm period bounds in minutes since midnight (20:30 and 6:30 by default)
+_CALM_START_MINUTES = CALM_TIME_START[0] * 60 + CALM_TIME_START[1]
+_CALM_END_MINUTES = CALM_TIME_END[0] * 60 + CALM_TIME_END[1]
+# (epoch minute, result) of the last is_calm_time() call; the answer can't change within a minute
+_calm_cache = (None, False)
 
 
 def is_calm_time():
     """Check if current time is within calm period (20:30-06:30)"""
+    global _calm_cache
+    epoch_minute = int(time.time() // 60)
+    if _calm_cache[0] == epoch_minute:
+        return _calm_cache[1]
     now = time.localtime()
     hour, minute = now.tm_hour, now.tm_min
     now_minutes = hour * 60 + minute
-    start = CALM_TIME_START[0] * 60 + CALM_TIME_START[1]  # 20:30 in minutes
-    end = CALM_TIME_END[0] * 60 + CALM_TIME_END[1]        # 6:30 in minutes
-    result = now_minutes >= start or now_minutes < end
-    print(f"[DEBUG] Current time: {hour:02}:{minute:02} | Calm period? {result}")
+    result = now_minutes >= _CALM_START_MINUTES or now_minutes < _CALM_END_MINUTES
+    logger.debug("Current time: %02d:%02d | Calm period? %s", hour, minute, result)
+    _calm_cache = (epoch_minute, result)
     return result
 
 
@@ -36,46 +47,65 @@ def select_story_for_time(stories, is_calm):
     Returns:
         dict: Selected story
     """
-    print(f"[DEBUG] Selecting story, calm time: {is_calm}")
+    logger.debug("Selecting story, calm time: %s", is_calm)
 
     if is_calm:
         try:
             selected_story = pick_story(stories, tone="calmo")
-            print(f"[DEBUG] Selected calm story: {selected_story['title']}")
+            logger.debug("Selected calm story: %s", selected_story['title'])
             return selected_story
         except Exception as e:
-            print(f"[WARNING] Failed to select calm story: {e}")
+            logger.warning(f"Failed to select calm story: {e}")
 
     try:
         # Filter out calm stories during active hours
         non_calm_stories = [s for s in stories if s.get("tone", "").lower() != "calmo"]
 
         if non_calm_stories:
-            selected_story = random.choice(non_calm_stories)
-            print(f"[DEBUG] Selected non-calm story: {selected_story['title']}")
+            selected_story = STORY_RNG.choice(non_calm_stories)
+            logger.debug("Selected non-calm story: %s", selected_story['title'])
             return selected_story
     except Exception as e:
-        print(f"[WARNING] Failed to filter non-calm stories: {e}")
+        logger.warning(f"Failed to filter non-calm stories: {e}")
 
     # Fallback to any random story if filtering fails
-    selected_story = random.choice(stories)
-    print(f"[DEBUG] Selected fallback story: {selected_story['title']}")
+    selected_story = STORY_RNG.choice(stories)
+    logger.debug("Selected fallback story: %s", selected_story['title'])
     return selected_story
 
 
+def select_story_for_card(card_data, is_calm):
+    """
+    Select a story from a cached card using its precomputed calm/active pools.
+    Equivalent to select_story_for_time(card_data["stories"], is_calm) without
+    re-filtering the story list on every tap.
+
+    Args:
+        card_data (dict): Card data as returned by load_card_stories()
+        is_calm (bool): True if during calm hours, False otherwise
+
+    Returns:
+        dict: Selected story
+    """
+    return STORY_RNG.choice(card_data["calm_stories" if is_calm else "active_stories"])
+
+
 # Constants for battery management
 LOW_BATTERY_THRESHOLD = 3.3  # Voltage level for low battery warning
 CRITICAL_BATTERY_THRESHOLD = 3.0  # Voltage level for critical battery shutdown
 
-# Initialize MCP3008 ADC (assuming channel 0 is used for battery voltage)
-mcp = MCP3008()
-battery_channel = AnalogIn(mcp, 0)
+# MCP3008 battery channel, created on first read so importing this module doesn't open SPI
+_battery_channel = None
 
 
 def read_battery_voltage():
     """Read the battery voltage from the ADC."""
-    voltage = battery_channel.voltage * 2  # Adjust for voltage divider
-    print(f"[DEBUG] Battery voltage: {voltage:.2f}V")
+    global _battery_channel
+    if _battery_channel is None:
+        # Assuming channel 0 is used for battery voltage
+        _battery_channel = AnalogIn(MCP3008(), 0)
+    voltage = _battery_channel.voltage * 2  # Adjust for voltage divider
+    logger.debug("Battery voltage: %.2fV", voltage)
     return voltage
 
 
@@ -97,13 +127,11 @@ def handle_battery_status(adc, led_manager=None):
     # If no ADC provided or on mock hardware, simulate values
     if adc is None:
         # In simulation mode, alternate between normal and low battery
-        import random
         voltage = random.choice([3.5, 3.3, 3.2])
     else:
         try:
             voltage = read_battery_voltage()
         except Exception as e:
-            from utils.log_utils import logger
             logger.error(f"Failed to read battery voltage: {e}")
             voltage = 3.8  # Default to a safe value on error
     
@@ -114,7 +142,6 @@ def handle_battery_status(adc, led_manager=None):
     status = 'normal'
     if voltage <= CRITICAL_BATTERY_THRESHOLD:
         status = 'critical'
-        from utils.log_utils import logger
         logger.warning(f"Critical battery level ({voltage:.2f}V, {percentage:.0f}%)! Initiating shutdown...")
         
         # Show critical battery warning if LED manager available
@@ -122,9 +149,7 @@ def handle_battery_status(adc, led_manager=None):
             led_manager.set_pattern('sos', count=1, next_pattern='error')
             
         # Safe shutdown procedure
-        stop_bgm()
-        import pygame
-        pygame.mixer.stop()
+        stop_all()
         
         # Delay before shutdown to allow warning to be seen
         time.sleep(2)
@@ -138,7 +163,6 @@ def handle_battery_status(adc, led_manager=None):
             
     elif voltage <= LOW_BATTERY_THRESHOLD:
         status = 'low'
-        from utils.log_utils import logger
         logger.warning(f"Low battery level ({voltage:.2f}V, {percentage:.0f}%)! Please recharge soon.")
         
         # Show low battery warning if LED manager available
@@ -1,5 +1,12 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
-from src.utils.data_utils import load_card_stories
+from pathlib import Path
+from unittest.mock import patch
+from src.utils import data_utils
+from src.utils.data_utils import load_card_stories, audio_file_exists
 
 class TestDataUtils(unittest.TestCase):
     def test_load_card_stories_invalid_uid(self):
@@ -8,5 +15,77 @@ class TestDataUtils(unittest.TestCase):
 
     # Add more tests for valid cases, malformed JSON, etc.
 
+class TestAudioIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.audio, self.bgm = root / "audio", root / "bgm"
+        (self.audio / "000001").mkdir(parents=True)
+        self.bgm.mkdir()
+        for patcher in (patch.object(data_utils, "AUDIO_FOLDER", self.audio),
+                        patch.object(data_utils, "BGM_FOLDER", self.bgm),
+                        patch.object(data_utils, "_AUDIO_INDEX", None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_indexes_only_regular_files(self):
+        (self.audio / "000001" / "1.mp3").write_bytes(b"")
+        (self.bgm / "calmo_loop.mp3").write_bytes(b"")
+        os.mkfifo(self.audio / "000001" / "2.mp3")
+        os.symlink(self.audio / "missing.mp3", self.audio / "000001" / "3.mp3")
+        self.assertTrue(audio_file_exists(self.audio / "000001" / "1.mp3"))
+        self.assertTrue(audio_file_exists(self.bgm / "calmo_loop.mp3"))
+        self.assertFalse(audio_file_exists(self.audio / "000001" / "2.mp3"))
+        self.assertFalse(audio_file_exists(self.audio / "000001" / "3.mp3"))
+        self.assertEqual(data_utils._AUDIO_INDEX, {str(self.audio / "000001" / "1.mp3"),
+                                                   str(self.bgm / "calmo_loop.mp3")})
+
+    def test_file_added_after_indexing_is_found(self):
+        self.assertFalse(audio_file_exists(self.audio / "late.mp3"))
+        (self.audio / "late.mp3").write_bytes(b"")
+        self.assertTrue(audio_file_exists(self.audio / "late.mp3"))
+
+    def test_index_built_once_across_threads(self):
+        build = data_utils._build_audio_index
+        calls = []
+        def slow_build():
+            calls.append(1)
+            time.sleep(0.05)
+            return build()
+        with patch.object(data_utils, "_build_audio_index", slow_build):
+            threads = [threading.Thread(target=audio_file_exists, args=(self.audio / "x.mp3",)) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(calls), 1)
+
+class TestCardCacheRevalidation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "card_test01.json"
+        for patcher in (patch.object(data_utils, "STORIES_FOLDER", Path(self.tmp.name)),
+                        patch.object(data_utils, "CARD_DATA_CACHE", data_utils.CARD_DATA_CACHE),
+                        patch.dict(data_utils._CARD_MTIMES)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write_card(self, title, mtime_ns):
+        self.path.write_text('{"stories": [{"title": "%s", "tone": "calmo"}]}' % title, encoding="utf-8")
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_card_served_from_cache(self):
+        self.write_card("first", 1_000_000_000)
+        first = load_card_stories("test01")
+        self.assertIs(load_card_stories("test01"), first)
+
+    def test_edited_card_is_reread(self):
+        self.write_card("first", 1_000_000_000)
+        self.assertEqual(load_card_stories("test01")["stories"][0]["title"], "first")
+        self.write_card("second", 2_000_000_000)
+        self.assertEqual(load_card_stories("test01")["stories"][0]["title"], "second")
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,8 @@
+import threading
+import time
 import unittest
-from src.hardware.hal import MockUIDReader, MockButton, BUTTON_TAP
+from src.hardware.hal import MockUIDReader, MockButton, MockVolumeControl, BUTTON_TAP
+from src.hardware.hal import CardPresenceFilter, CardPoller, CARD_NO_EVENT, CARD_PRESENT, CARD_REMOVED
 
 class TestMockUIDReader(unittest.TestCase):
     def test_uid_cycle(self):
@@ -7,6 +10,110 @@ class TestMockUIDReader(unittest.TestCase):
         uids = [reader.read_uid() for _ in range(10)]
         self.assertEqual(len(set(uids)), 10)
 
+    def test_card_pending_after_read(self):
+        # The next simulated card only arrives 1-2 seconds after a read
+        reader = MockUIDReader()
+        reader.read_uid()
+        self.assertFalse(reader.card_pending())
+
+class TestCardPresenceFilter(unittest.TestCase):
+    def test_missed_read_does_not_retrigger(self):
+        card_filter = CardPresenceFilter(confirm_reads=2, removal_misses=3)
+        self.assertEqual(card_filter.update("000001"), (CARD_NO_EVENT, None))
+        self.assertEqual(card_filter.update("000001"), (CARD_PRESENT, "000001"))
+        # Alternate-poll misses while the tag rests on the reader
+        for uid in [None, "000001", None, "000001"]:
+            self.assertEqual(card_filter.update(uid), (CARD_NO_EVENT, None))
+
+    def test_removal_after_consecutive_misses(self):
+        card_filter = CardPresenceFilter(confirm_reads=1, removal_misses=3)
+        self.assertEqual(card_filter.update("000002"), (CARD_PRESENT, "000002"))
+        self.assertEqual(card_filter.update(None), (CARD_NO_EVENT, None))
+        self.assertEqual(card_filter.update(None), (CARD_NO_EVENT, None))
+        self.assertEqual(card_filter.update(None), (CARD_REMOVED, "000002"))
+
+class StuckReader:
+    """Reader whose read_uid() blocks until released, like a wedged SPI transfer"""
+    def __init__(self):
+        self.release = threading.Event()
+
+    def attach_wakeup(self, wake_event):
+        pass
+
+    def card_pending(self):
+        return True
+
+    def read_uid(self):
+        self.release.wait()
+        return None
+
+class CountingReader:
+    """Reader that always has a read pending and never sees a card"""
+    def __init__(self):
+        self.reads = 0
+
+    def attach_wakeup(self, wake_event):
+        pass
+
+    def card_pending(self):
+        return True
+
+    def read_uid(self):
+        self.reads += 1
+        time.sleep(0.005)
+        return None
+
+class TestCardPoller(unittest.TestCase):
+    def test_queues_card_and_wakes_main_loop(self):
+        wake = threading.Event()
+        poller = CardPoller(MockUIDReader(), CardPresenceFilter(confirm_reads=1), main_wake=wake)
+        poller.start()
+        try:
+            self.assertTrue(wake.wait(3))
+            event, uid = poller.get_event()
+            self.assertEqual(event, CARD_PRESENT)
+            self.assertEqual(uid, "000000")
+        finally:
+            poller.stop()
+
+    def test_watchdog_restarts_stuck_read(self):
+        reader = StuckReader()
+        poller = CardPoller(reader, CardPresenceFilter(), stall_timeout=0.05)
+        poller.start()
+        try:
+            time.sleep(0.1)
+            self.assertTrue(poller.check_watchdog())
+            self.assertEqual(poller.get_event(), (CARD_NO_EVENT, None))
+        finally:
+            poller.stop()
+            reader.release.set()
+
+    def test_thread_init_runs_on_each_polling_thread(self):
+        reader = StuckReader()
+        started = []
+        poller = CardPoller(reader, CardPresenceFilter(), stall_timeout=0.05,
+                            thread_init=lambda: started.append(threading.get_ident()))
+        poller.start()
+        try:
+            time.sleep(0.1)
+            self.assertTrue(poller.check_watchdog())
+            time.sleep(0.05)
+            self.assertEqual(len(set(started)), 2)
+        finally:
+            poller.stop()
+            reader.release.set()
+
+    def test_read_interval_spaces_out_reads(self):
+        reader = CountingReader()
+        poller = CardPoller(reader, CardPresenceFilter())
+        poller.set_read_interval(0.1)
+        poller.start()
+        try:
+            time.sleep(0.35)
+            self.assertLessEqual(reader.reads, 5)
+        finally:
+            poller.stop()
+
 class TestMockButton(unittest.TestCase):
     def test_led_state(self):
         button = MockButton()
@@ -20,5 +127,15 @@ class TestMockButton(unittest.TestCase):
         button._event_queue.append(BUTTON_TAP)
         self.assertEqual(button.get_event(), BUTTON_TAP)
 
+class TestMockVolumeControl(unittest.TestCase):
+    def test_reports_only_changes_past_threshold(self):
+        volume = MockVolumeControl()
+        self.assertEqual(volume.get_volume_if_changed(0.03), 0.75)
+        self.assertIsNone(volume.get_volume_if_changed(0.03))
+        volume._volume = 0.77
+        self.assertIsNone(volume.get_volume_if_changed(0.03))
+        volume._volume = 0.8
+        self.assertEqual(volume.get_volume_if_changed(0.03), 0.8)
+
 if __name__ == "__main__":
     unittest.main()
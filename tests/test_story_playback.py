@@ -0,0 +1,105 @@
+import unittest
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+from src.utils import audio_utils
+from src.utils.audio_utils import StoryPlayback, STORY_STEPS
+
+def step_end(name):
+    """Time at which a timed step ends, for a sequence started at 0 whose narration ends immediately"""
+    total = 0.0
+    for step, duration, _ in STORY_STEPS:
+        total += duration or 0.0
+        if step == name:
+            return total
+    raise KeyError(name)
+
+class TestStoryPlayback(unittest.TestCase):
+    def setUp(self):
+        pygame_patch = patch.object(audio_utils, "pygame")
+        self.pygame = pygame_patch.start()
+        self.addCleanup(pygame_patch.stop)
+        self.channel = self.pygame.mixer.Channel.return_value
+        self.channel.get_busy.return_value = False
+        bgm_patch = patch.object(audio_utils, "_bgm_player", MagicMock())
+        self.bgm = bgm_patch.start()
+        self.addCleanup(bgm_patch.stop)
+        self.playback = StoryPlayback()
+
+    def step(self):
+        return STORY_STEPS[self.playback._step][0] if self.playback.active else None
+
+    def test_steps_run_in_order(self):
+        narration = MagicMock()
+        self.playback.start(narration, 0.0)
+        self.assertEqual(self.step(), "intro")
+        self.playback.tick(step_end("intro"))
+        self.assertEqual(self.step(), "fade_to_narration")
+        self.playback.tick(step_end("lead_in"))
+        self.assertEqual(self.step(), "narration")
+        self.channel.play.assert_called_once_with(narration)
+        self.assertIsNone(self.playback.next_deadline())  # Waits for NARRATION_END_EVENT
+        now = step_end("lead_in")
+        self.playback.narration_ended(now)
+        self.assertEqual(self.step(), "raise")
+        self.playback.tick(now + step_end("outro") - step_end("lead_in") + 1e-6)
+        self.assertEqual(self.step(), "fade_out")
+        self.bgm.stop.assert_not_called()
+        self.playback.tick(now + step_end("fade_out") - step_end("lead_in") + 1e-6)
+        self.assertFalse(self.playback.active)
+        self.bgm.stop.assert_called_once()
+
+    def test_narration_end_ignored_while_channel_busy(self):
+        self.playback.start(MagicMock(), 0.0)
+        self.playback.tick(step_end("lead_in"))
+        self.channel.get_busy.return_value = True
+        self.playback.narration_ended(step_end("lead_in"))
+        self.assertEqual(self.step(), "narration")
+
+    def test_pause_freezes_timeline(self):
+        self.playback.start(MagicMock(), 0.0)
+        self.playback.tick(0.5)
+        self.playback.pause(0.5)
+        self.channel.pause.assert_called_once()
+        self.assertIsNone(self.playback.next_deadline())
+        self.playback.tick(5.0)
+        self.assertEqual(self.step(), "intro")
+        self.playback.resume(10.0)
+        self.channel.unpause.assert_called_once()
+        self.assertEqual(self.playback.next_deadline(), 10.0)
+        # The intro had 0.5s left when paused
+        self.playback.tick(10.0 + step_end("intro") - 0.5 - 0.01)
+        self.assertEqual(self.step(), "intro")
+        self.playback.tick(10.0 + step_end("intro") - 0.5)
+        self.assertEqual(self.step(), "fade_to_narration")
+
+    def test_waits_for_narration_still_decoding(self):
+        narration = Future()
+        self.playback.start(narration, 0.0)
+        self.playback.tick(step_end("lead_in"))
+        self.assertEqual(self.step(), "narration")
+        self.channel.play.assert_not_called()
+        sound = MagicMock()
+        narration.set_result(sound)
+        self.playback.tick(self.playback.next_deadline())
+        self.channel.play.assert_called_once_with(sound)
+
+    def test_reselect_cancels_previous_story(self):
+        first, second = Future(), MagicMock()
+        with patch.object(audio_utils, "STORY_PLAYBACK", self.playback):
+            self.playback.start(first, 0.0)
+            self.playback.tick(step_end("lead_in"))
+            audio_utils.stop_story()
+        self.assertFalse(self.playback.active)
+        self.assertIsNone(self.playback.next_deadline())
+        # The first story's decode finishing late must not start it
+        first.set_result(MagicMock())
+        self.playback.tick(10.0)
+        self.playback.narration_ended(10.0)
+        self.channel.play.assert_not_called()
+        self.playback.start(second, 20.0)
+        self.assertEqual(self.step(), "intro")
+        self.playback.tick(20.0 + step_end("lead_in"))
+        self.channel.play.assert_called_once_with(second)
+
+if __name__ == "__main__":
+    unittest.main()
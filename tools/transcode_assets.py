@@ -0,0 +1,100 @@
+"""
+Transcode the narration and BGM MP3s so pygame decodes them faster on the Raspberry Pi.
+MP3 decoding dominates narration preload time; OGG Vorbis decodes several times faster and
+WAV (16-bit PCM) needs no decoding at all, at roughly ten times the disk space.
+
+Narrations are rewritten in each card's JSON ("audio": "audio/<uid>/1.mp3" -> ".ogg"), and
+BGM loops are picked up by bgm_utils from the file next to the MP3. The MP3s are kept, so
+the change can be reverted by restoring the card files. Requires ffmpeg on the PATH.
+
+Usage (from the repository root):
+    python tools/transcode_assets.py          # OGG Vorbis, quality 5
+    python tools/transcode_assets.py --wav    # 16-bit PCM WAV
+"""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+ASSET_FOLDERS = (SRC_DIR / "audio", SRC_DIR / "bgm")
+STORIES_FOLDER = SRC_DIR / "storiesoffline"
+
+# Matches the mixer settings in config/app_config.py, so SDL doesn't resample at load time
+SAMPLE_RATE = "44100"
+CHANNELS = "2"
+CODECS = {
+    ".ogg": ["-c:a", "libvorbis", "-q:a", "5"],
+    ".wav": ["-c:a", "pcm_s16le"],
+}
+# Card JSON is hand-formatted, so audio entries are rewritten in place rather than re-dumped
+AUDIO_ENTRY = re.compile(r'("audio"\s*:\s*")([^"]+)\.mp3(")')
+
+
+def transcode(source, suffix):
+    """Convert one MP3 unless an up-to-date output already exists; returns True on success"""
+    target = source.with_suffix(suffix)
+    if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+        return True
+    result = subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", str(source), "-ar", SAMPLE_RATE, "-ac", CHANNELS,
+         *CODECS[suffix], str(target)],
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"[ERROR] {source.relative_to(SRC_DIR)}: {result.stderr.strip()}")
+        target.unlink(missing_ok=True)
+        return False
+    print(f"[OK] {target.relative_to(SRC_DIR)}")
+    return True
+
+
+def rewrite_card(path, suffix):
+    """Point a card's audio entries at the transcoded files that exist; returns the number changed"""
+    text = path.read_text(encoding="utf-8")
+    changed = 0
+
+    def replace(match):
+        nonlocal changed
+        if not (SRC_DIR / (match.group(2) + suffix)).is_file():
+            return match.group(0)
+        changed += 1
+        return match.group(1) + match.group(2) + suffix + match.group(3)
+
+    updated = AUDIO_ENTRY.sub(replace, text)
+    if changed:
+        json.loads(updated)  # Never write back a card that no longer parses
+        path.write_text(updated, encoding="utf-8")
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", action="store_true", help="write 16-bit PCM WAV instead of OGG Vorbis")
+    parser.add_argument("--jobs", type=int, default=4, help="parallel ffmpeg processes (default 4)")
+    args = parser.parse_args()
+    suffix = ".wav" if args.wav else ".ogg"
+
+    if shutil.which("ffmpeg") is None:
+        print("[ERROR] ffmpeg not found on PATH")
+        return 1
+
+    sources = sorted(p for folder in ASSET_FOLDERS for p in folder.rglob("*.mp3"))
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        failed = list(pool.map(lambda source: transcode(source, suffix), sources)).count(False)
+
+    cards_changed = 0
+    for card in sorted(STORIES_FOLDER.glob("card_*.json")):
+        if rewrite_card(card, suffix):
+            cards_changed += 1
+
+    print(f"Transcoded {len(sources) - failed}/{len(sources)} files, updated {cards_changed} cards")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())